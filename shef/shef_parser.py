@@ -1,14 +1,20 @@
 #!/bin/python3
-import argparse, copy, logging, os, re, sys, textwrap, types
+import argparse, logging, os, re, sys, textwrap, time, types
+from calendar    import isleap
+from calendar    import monthrange
 from collections import deque
+from datetime    import date
 from datetime    import datetime
 from datetime    import timedelta
 from datetime    import timezone
+from functools   import lru_cache
 from io          import BufferedRandom
 from io          import StringIO
 from io          import TextIOWrapper
+from itertools   import islice
 from pathlib     import Path
 from typing      import Any
+from typing      import Callable
 from typing      import Optional
 from typing      import TextIO
 from typing      import Union
@@ -176,6 +182,15 @@ class MonthsDelta :
         self._months = months
         self._eom    = eom
 
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def cached(months: int, eom: bool=False) -> "MonthsDelta" :
+        '''
+        Get a shared object for the specified increment. Objects are never modified after construction,
+        so every relative time or interval of the same length can share one.
+        '''
+        return MonthsDelta(months, eom)
+
     @property
     def months(self) -> int :
         '''
@@ -200,7 +215,7 @@ class ShefParser :
     '''
     The parser
     '''
-    PE_CONVERSIONS = {
+    PE_CONVERSIONS = types.MappingProxyType({
         #
         # May be modified by SHEFPARM file
         #
@@ -243,9 +258,11 @@ class ShefParser :
         "WH" :        1.0, "WL" :        1.0, "WO" :        1.0, "WP" :        1.0, "WS" :        1.0, "WT" :        1.0, "WV" :  3.2808399,
         "WX" :        1.0, "WY" :        1.0, "XC" :        1.0, "XG" :        1.0, "XL" :        1.0, "XP" :        1.0, "XR" :        1.0,
         "XU" :  2.2883564, "XV" :  0.6213712, "XW" :        1.0, "YA" :        1.0, "YC" :        1.0, "YF" :        1.0, "YI" :        1.0,
-        "YP" :        1.0, "YR" :        1.0, "YS" :        1.0, "YT" :        1.0, "YV" :        1.0, "YY" :        1.0}
+        "YP" :        1.0, "YR" :        1.0, "YS" :        1.0, "YT" :        1.0, "YV" :        1.0, "YY" :        1.0})
+
+    PE_UNIT_CONVERSIONS = types.MappingProxyType({k : (1.8, 32.) if v == -1 else (v, 0.) for k, v in PE_CONVERSIONS.items()}) # (scale, offset) by PE code
 
-    SEND_CODES = {
+    SEND_CODES = types.MappingProxyType({
         #
         # May be modified by SHEFPARM file
         #
@@ -258,9 +275,9 @@ class ShefParser :
         "QX" : ("QRIRZXZ", False), "QY" : ("QRIRZZZ", True) , "SF" : ("SFD",     False), "TN" : ("TAIRZNZ", False), "QV" : ("QVZ",     False),
         "RI" : ("RID",     False), "RP" : ("RPD",     False), "RT" : ("RTD",     False), "TC" : ("TCS",     False), "TF" : ("TFS",     False),
         "TH" : ("THS",     False), "TX" : ("TAIRZXZ", False), "UC" : ("UCD",     False), "UL" : ("ULD",     False), "XG" : ("XGJ",     False),
-        "XP" : ("XPQ",     False)}
+        "XP" : ("XPQ",     False)})
 
-    DURATION_CODES    = {
+    DURATION_CODES    = types.MappingProxyType({
         #
         # May be modified by SHEFPARM file
         #
@@ -270,9 +287,26 @@ class ShefParser :
         'J' :   30, 'H' : 1001, 'B' : 1002, 'T' : 1003, 'F' : 1004,
         'Q' : 1006, 'A' : 1008, 'K' : 1012, 'L' : 1018, 'D' : 2001,
         'W' : 2007, 'N' : 2015, 'M' : 3001, 'Y' : 4001, 'Z' : 5000,
-        'S' : 5001, 'R' : 5002, 'V' : 5003, 'P' : 5004, 'X' : 5005}
+        'S' : 5001, 'R' : 5002, 'V' : 5003, 'P' : 5004, 'X' : 5005})
 
-    TS_CODES = set((
+    DURATION_IDS = types.MappingProxyType({v : k for k, v in DURATION_CODES.items()}) # duration codes by numeric value
+
+    INTERVAL_UNITS = types.MappingProxyType({
+        #
+        # .E interval unit : (numeric duration code offset, interval factory)
+        #
+        # the missing factories for minute and year intervals preserve the legacy behavior of
+        # DIN and DIY codes, which set the duration code but leave the interval unchanged
+        #
+        'S' : (7000, lambda v : timedelta(seconds=v)),
+        'N' : (   0, None),
+        'H' : (1000, lambda v : timedelta(hours=v)),
+        'D' : (2000, lambda v : timedelta(days=v)),
+        'M' : (3000, lambda v : MonthsDelta.cached(v)),
+        'E' : (3000, lambda v : MonthsDelta.cached(v, eom=True)),
+        'Y' : (4000, None)})
+
+    TS_CODES = frozenset((
         #
         # May be modified by SHEFPARM file
         #
@@ -293,13 +327,13 @@ class ShefParser :
         "PM", "PN", "PO", "PP", "PQ", "PR", "PS", "PT", "PU", "PV", "PW", "PX", "PY", "PZ", "R2", "R3", "R4", "R5", "R6", "R7", "R8", "R9",
         "RA", "RB", "RC", "RD", "RF", "RG", "RM", "RP", "RR", "RS", "RT", "RV", "RW", "RX", "RZ", "ZZ"))
 
-    EXTREMUM_CODES = set((
+    EXTREMUM_CODES = frozenset((
         #
         # May be modified by SHEFPARM file
         #
         'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'P', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z'))
 
-    PROBABILITY_CODES = {
+    PROBABILITY_CODES = types.MappingProxyType({
         #
         # May be modified by SHEFPARM file
         #
@@ -310,9 +344,9 @@ class ShefParser :
         '6' :    .6, '7' :    .7, 'H' :   .75, '8' :    .8, '9' :    .9, 'T' :   .95,
         'U' :   .96, 'V' :   .98, 'W' :   .99, 'X' :  .996, 'Y' :  .998, 'J' : .0013,
         'K' : .0228, 'L' : .1587, 'M' :  -0.5, 'N' : .8413, 'P' : .9772, 'Q' : .9987,
-        'Z' :  -1.0}
+        'Z' :  -1.0})
 
-    QUALIFIER_CODES = set((
+    QUALIFIER_CODES = frozenset((
         #
         # May be modified by SHEFPARM file
         #
@@ -388,6 +422,152 @@ class ShefParser :
 
     UTC = ZoneInfo("UTC")
 
+    MAX_MEMO_SIZE = 4096 # entries a per-parser memo dict may hold before it is cleared
+
+    QUOTED_TEXT_PATTERN  = re.compile(r"\"[^\"]*\"?|'[^']*'?") # quoted text, closing quote is optional at end of string
+    HIDE_WHITESPACE      = str.maketrans(" \t", "\x00\x01")
+    UNHIDE_WHITESPACE    = str.maketrans("\x00\x01", " \t")
+    SWAP_WHITESPACE      = str.maketrans(" \t\x00\x01", "\x00\x01 \t")
+
+    OBS_TIME_FIELDS = {
+        #
+        # Base time fields replaced by absolute observation time codes, by code character and value length.
+        # Each item is (field index (0=year .. 5=second), start, end) of the value substring. The year for
+        # DY codes and the century for DTcc are computed separately.
+        #
+        ('S',  2) : ((5, 0, 2),),                                                                     # DSss
+        ('N',  4) : ((4, 0, 2), (5, 2, 4)),                                                           # DNnnss
+        ('N',  2) : ((4, 0, 2),),                                                                     # DNnn
+        ('H',  6) : ((3, 0, 2), (4, 2, 4), (5, 4, 6)),                                                # DHhhnnss
+        ('H',  4) : ((3, 0, 2), (4, 2, 4)),                                                           # DHhhnn
+        ('H',  2) : ((3, 0, 2),),                                                                     # DHhh
+        ('D',  8) : ((2, 0, 2), (3, 2, 4), (4, 4, 6), (5, 6, 8)),                                     # DDddhhnnss
+        ('D',  6) : ((2, 0, 2), (3, 2, 4), (4, 4, 6)),                                                # DDddhhnn
+        ('D',  4) : ((2, 0, 2), (3, 2, 4)),                                                           # DDddhh
+        ('D',  2) : ((2, 0, 2),),                                                                     # DDdd
+        ('M', 10) : ((1, 0, 2), (2, 2, 4), (3, 4, 6), (4, 6, 8), (5, 8, 10)),                         # DMmmddhhnnss
+        ('M',  8) : ((1, 0, 2), (2, 2, 4), (3, 4, 6), (4, 6, 8)),                                     # DMmmddhhnn
+        ('M',  6) : ((1, 0, 2), (2, 2, 4), (3, 4, 6)),                                                # DMmmddhh
+        ('M',  4) : ((1, 0, 2), (2, 2, 4)),                                                           # DMmmdd
+        ('M',  2) : ((1, 0, 2),),                                                                     # DMmm
+        ('Y', 12) : ((1, 2, 4), (2, 4, 6), (3, 6, 8), (4, 8, 10), (5, 10, 12)),                       # DYyymmddhhnnss
+        ('Y', 10) : ((1, 2, 4), (2, 4, 6), (3, 6, 8), (4, 8, 10)),                                    # DYyymmddhhnn
+        ('Y',  8) : ((1, 2, 4), (2, 4, 6), (3, 6, 8)),                                                # DYyymmddhh
+        ('Y',  6) : ((1, 2, 4), (2, 4, 6)),                                                           # DYyymmdd
+        ('Y',  4) : ((1, 2, 4),),                                                                     # DYyymm
+        ('Y',  2) : (),                                                                               # DYyy
+        ('T', 14) : ((0, 0, 4), (1, 4, 6), (2, 6, 8), (3, 8, 10), (4, 10, 12), (5, 12, 14)),          # DTccyymmddhhnnss
+        ('T', 12) : ((0, 0, 4), (1, 4, 6), (2, 6, 8), (3, 8, 10), (4, 10, 12)),                       # DTccyymmddhhnn
+        ('T', 10) : ((0, 0, 4), (1, 4, 6), (2, 6, 8), (3, 8, 10)),                                    # DTccyymmddhh
+        ('T',  8) : ((0, 0, 4), (1, 4, 6), (2, 6, 8)),                                                # DTccyymmdd
+        ('T',  6) : ((0, 0, 4), (1, 4, 6)),                                                           # DTccyymm
+        ('T',  4) : ((0, 0, 4),),                                                                     # DTccyy
+        ('T',  2) : ()}                                                                               # DTcc
+
+    CREATE_TIME_FIELDS = {
+        #
+        # Creation time fields specified by DC codes, by value length. Each item is (field index (0=year .. 4=minute),
+        # start, end) of the value substring. The year defaults to that of the observation time, and the century
+        # for DCyy... is computed separately.
+        #
+        12 : ((0, 0, 4), (1, 4, 6), (2, 6, 8), (3, 8, 10), (4, 10, 12)),                              # DCccyymmddhhnn
+        10 : ((0, 0, 2), (1, 2, 4), (2, 4, 6), (3, 6, 8), (4, 8, 10)),                                 # DCyymmddhhnn
+         8 : ((1, 0, 2), (2, 2, 4), (3, 4, 6), (4, 6, 8)),                                             # DCmmddhhnn
+         6 : ((1, 0, 2), (2, 2, 4), (3, 4, 6)),                                                        # DCmmddhh
+         4 : ((1, 0, 2), (2, 2, 4))}                                                                   # DCmmdd
+
+    #------------------------------------------------------#
+    # message parsing patterns, compiled once for all      #
+    # parsers and accessed as self._..._pattern            #
+    #------------------------------------------------------#
+    _msg_start_pattern                = re.compile(r"^\.[ABE]R?\s", re.I)
+    _msg_continue_patterns            = {'A' : (re.compile(r"^\.A\d{1,2}", re.I), re.compile(r"^\.AR?\d{1,2}", re.I)),
+                                         'E' : (re.compile(r"^\.E\d{1,2}", re.I), re.compile(r"^\.ER?\d{1,2}", re.I)),
+                                         'B' : (re.compile(r"^\.B\d{1,2}", re.I), re.compile(r"^\.BR?\d{1,2}", re.I))}
+    _positional_fields_pattern         = re.compile(
+                                        # 1 = location id
+                                        # 2 = date-time
+                                        # 6 = time zone
+                                        #                 1           23       4
+                                           r"^\.[AEB]R?\s+(\w{3,8})\s+((\d{2})?(\d{2})?\d{4})" \
+                                        #    5   6
+                                           r"(\s+([NAECMPYLHB][DS]?|[JZ]))?\s+?", re.I|re.M)
+    _dot_b_header_lines_pattern       = re.compile(r"^.B(R?)\s.+?$(\n^.B\1?\d\s.+?$)*", re.I|re.M)
+    _dot_b_body_line_pattern          = re.compile(r"^(\w{3,8})\s+\S+.*$")
+    _obs_time_pattern                 = re.compile(
+                                        # 1 = date/time
+                                        # 2 = date/time code
+                                        # 3 = date/time value
+                                        #    12                           3
+                                           r"(D[SNHDMYJT]|DR[SNHDMYE][+-]?)(\d+)", re.I)
+    _multiple_obs_time_pattern        = re.compile(
+                                        # matches a date/time and the separator that follows it when the next
+                                        # field is also a date/time, so one substitution joins a whole run
+                                        #
+                                        # 1 = date/time
+                                        #    1                                        (separator)  (next date/time code, not consumed)
+                                           r"((?:D[SNHDMYJT]|DR[SNHDMYE][+-]?)\d+)(?:\s+|/)(?=(?:D[SNHDMYJT]|DR[SNHDMYE][+-])\d)", re.I)
+    _obs_time_pattern2                = re.compile(
+                                        # 1 = first date/time
+                                        # 2 = first date/time code
+                                        # 3 = first date/time value
+                                        # 4 = next data
+                                        # 5 = next date/time code
+                                        # 6 = next date/time value
+                                        #    12                        3          4 5                        6
+                                           r"((D[SNHDMYJT]|DR[SNHDMYE])([+-]?\d+))(@(D[SNHDMYJT]|DR[SNHDMYE])([+-]?\d+))*?", re.I)
+    _create_time_pattern              = re.compile(r"DC\d+", re.I)
+    _unit_system_pattern              = re.compile(r"DU[ES]", re.I)
+    _data_qualifier_pattern           = re.compile(r"DQ.", re.I)
+    _duration_code_pattern            = re.compile(r"(DV[SNHDMY]\d{1,2}|DVZ)", re.I)
+    _parameter_code_pattern           = re.compile(r"^[A-CE-IL-NP-Y][A-Z](([A-Z]([A-Z0-9]{2})?[A-Z]{1,2})?)?", re.I)
+    _interval_pattern                 = re.compile(r"DI[SNHDMEY][+-]?\d{1,2}", re.I)
+    _signed_integer_pattern           = re.compile(r"[+-]?\d+")
+    _value_pattern                    = re.compile(
+                                       # 1 = value
+                                       # 2 = numeric value
+                                       # 3 = trace value
+                                       # 4 = missing valule
+                                       # 5 = value qualifier
+                                       #     1 2                              3    4                 5
+                                           r"(^([+-]?(?:\d+(?:\.\d*)?|\.\d+))|(T+)|([M.+-]+|\+{1,2}))([A-Z]?$)", re.I)
+    _alt_value_pattern                = re.compile(
+                                       # 1 = numeric value
+                                       # 2 = value qualifier (followed by whitespace, a quote, or nothing)
+                                       # neither group is matched for a number without a qualifier
+                                       #    1                         2
+                                           r"([+-]?(?:\d+\.?\d*|\.\d+))([A-Za-z])(?=[\s'\"]|\Z)|[+-]?\d*\.?\d*\Z")
+    _retained_comment_pattern         = re.compile(r"(([\"']).+(\2|$))")
+    _data_string_item_pattern         = re.compile(
+                                        # classifies an .A or .E data string item (or a .B parameter control
+                                        # field) with a single match; the alternatives are tried in order, and
+                                        # the observation time may be anywhere in the item (like
+                                        # _obs_time_pattern2.search())
+                                        #
+                                        # lastgroup = obs_time, create_time, unit_system, data_qualifier,
+                                        #             duration_code, interval, parameter_code, or value
+                                           f"(?P<obs_time>.*?{_obs_time_pattern2.pattern})"
+                                           f"|(?P<create_time>{_create_time_pattern.pattern})"
+                                           f"|(?P<unit_system>{_unit_system_pattern.pattern})"
+                                           f"|(?P<data_qualifier>{_data_qualifier_pattern.pattern})"
+                                           f"|(?P<duration_code>{_duration_code_pattern.pattern})"
+                                           f"|(?P<interval>{_interval_pattern.pattern})"
+                                           f"|(?P<parameter_code>{_parameter_code_pattern.pattern})"
+                                           f"|(?P<value>{_value_pattern.pattern})", re.I)
+    _dot_b_body_item_pattern          = re.compile(
+                                        # classifies a .B body item with a single match; the alternatives are
+                                        # tried in order, and anything not matched is a value
+                                        #
+                                        # lastgroup = obs_time, create_time, unit_system, data_qualifier, or
+                                        #             duration_code
+                                           f"(?P<obs_time>{_obs_time_pattern.pattern})"
+                                           f"|(?P<create_time>{_create_time_pattern.pattern})"
+                                           f"|(?P<unit_system>{_unit_system_pattern.pattern})"
+                                           f"|(?P<data_qualifier>{_data_qualifier_pattern.pattern})"
+                                           f"|(?P<duration_code>{_duration_code_pattern.pattern})", re.I)
+    _replacement_strip_pattern        = re.compile("^["+chr(0)+chr(9)+"]+|["+chr(0)+chr(9)+"]+$")
+    _replacement_split_pattern        = re.compile('['+chr(0)+chr(9)+']')
+
     class Exc(Exception) :
         '''
         Base class for ShefParser exceptions
@@ -462,11 +642,41 @@ class ShefParser :
             'B' :  660, "BS" : 660, "BD" : 600,
             'J' : -480}
 
+        SUMMER_TIME_ZONES = frozenset(
+            #
+            # Local (non-standard, non-daylight) time zones that observe summer time.
+            # Used only when time zone is a string.
+            #
+            tz for tz in TZ_OFFSETS if len(tz) == 1 and tz not in "ZNH")
+
+        SUMMER_TIME_RANGES = tuple(
+            #
+            # (month, day, hour, minute) of transition for winter->summer and summer->winter for years 1976-2040,
+            # generated from DST_DATES. A time is in summer time if start < (m, d, h, n) <= end.
+            # Used only when time zone is a string.
+            #
+            ((4 if y < 2007 else 3, dom[0], 2, 0), (10 if y < 2007 else 11, dom[1], 2, 0))
+            for y, dom in zip(range(1976, 2041), DST_DATES))
+
+        LEAP_YEARS = frozenset(
+            #
+            # Leap years in the range of years accepted in SHEF dates (1700-2100)
+            #
+            y for y in range(1700, 2101) if isleap(y))
+
+        DAYS_IN_MONTH = {
+            #
+            # Last day of each (year, month) in the range of years accepted in SHEF dates (1700-2100)
+            #
+            (y, m) : monthrange(y, m)[1] for y in range(1700, 2101) for m in range(1, 13)}
+
         @staticmethod
         def is_leap(y: int) -> bool :
             '''
             Is year a leap year?
             '''
+            if 1700 <= y <= 2100 :
+                return y in ShefParser.DateTime.LEAP_YEARS
             return (not bool(y % 4) and bool(y % 100)) or (not bool(y % 400))
 
         @staticmethod
@@ -474,6 +684,9 @@ class ShefParser :
             '''
             Get last day of month (year required for February)
             '''
+            last_day = ShefParser.DateTime.DAYS_IN_MONTH.get((y, m))
+            if last_day is not None :
+                return last_day
             return 31 if m in (1,3,5,7,8,10,12) else 30 if m in (4,6,9,11) else 29 if ShefParser.DateTime.is_leap(y) else 28
 
         @staticmethod
@@ -482,21 +695,10 @@ class ShefParser :
             Shefit algorithm for determining whether a date/time is in daylight savings (summer) time.
             Used only when time zone is a string.
             '''
-            summer_time = False
-            y = max(min(y, 2040), 1976)
-            if 1976 <= y <= 2040 and 3 <= m <= 10 :
-                dom = ShefParser.DateTime.DST_DATES[y-1976]
-                if y < 2007 :
-                    months = (4, 10)
-                else :
-                    months = (3, 11)
-                if months[0] < m < months[1] :
-                    summer_time = True
-                elif m == months[0] and (d > dom[0] or (d == dom[0] and h > 2) or (d == dom[0] and h == 2 and n > 0)) :
-                    summer_time = True
-                elif m == months[1] and (d < dom[1] or (d == dom[1] and h < 2) or (d == dom[1] and h == 2 and n == 0)) :
-                    summer_time = True
-            return summer_time
+            if not 3 <= m <= 10 :
+                return False
+            start, end = ShefParser.DateTime.SUMMER_TIME_RANGES[max(min(y, 2040), 1976)-1976]
+            return start < (m, d, h, n) <= end
 
         @staticmethod
         def now(tz: Union[timezone, ZoneInfo, str]) -> "ShefParser.DateTime" :
@@ -506,6 +708,15 @@ class ShefParser :
             t = datetime.now()
             return ShefParser.DateTime(t.year, t.month, t.day, t.hour, t.minute, t.second, tzinfo=tz)
 
+        @staticmethod
+        @lru_cache(maxsize=1024)
+        def cached(y: int, m: int, d: int, h: int, n: int, s: int, tz: Union[timezone, ZoneInfo, str]) -> "ShefParser.DateTime" :
+            '''
+            Get a shared object for the specified date/time. Objects are never modified after construction,
+            so the many values with the same observation time can share one.
+            '''
+            return ShefParser.DateTime(y, m, d, h, n, s, tzinfo=tz)
+
         @staticmethod
         def clone(other: "ShefParser.DateTime") -> "ShefParser.DateTime" :
             '''
@@ -521,7 +732,7 @@ class ShefParser :
             DateTime constructor
             '''
             args2   = args[:]
-            kwargs2 = copy.deepcopy(kwargs)
+            kwargs2 = dict(kwargs)
             if "tzinfo" in kwargs2 :
                 tzinfo = kwargs2["tzinfo"]
             else :
@@ -564,12 +775,11 @@ class ShefParser :
                 #--------------#
                 # shefit times #
                 #--------------#
-                if len(tzinfo) == 1 and tzinfo not in "ZNH" :
+                if tzinfo in ShefParser.DateTime.SUMMER_TIME_ZONES :
                     y, m, d, h, n, s = self._dt.year, self._dt.month, self._dt.day, self._dt.hour, self._dt.minute, self._dt.second
                     if 1976 <= y <= 2040 and m in (3,4) and h == 2 and (n != 0 or s != 0) :
-                        dom = ShefParser.DateTime.DST_DATES[y-1976]
-                        mo = 4 if y < 2007 else 3
-                        if m == mo and d == dom[0] :
+                        start = ShefParser.DateTime.SUMMER_TIME_RANGES[y-1976][0]
+                        if (m, d) == start[:2] :
                             raise ShefParser.DateTimeException(f"Invalid time: [{self._dt}]. 02:00:01..02:59:59 is not allowed on date of transition to Daylight Saving with time zone [{tzinfo}]")
             else :
                 #--------------#
@@ -584,7 +794,7 @@ class ShefParser :
             '''
             dt = self._dt
             if isinstance(self._tzinfo, str) :
-                if len(self._tzinfo) == 1 and self._tzinfo not in "ZNH" :
+                if self._tzinfo in ShefParser.DateTime.SUMMER_TIME_ZONES :
                     return  ShefParser.DateTime.is_shef_summer_time(dt.year, dt.month, dt.day, dt.hour, dt.minute)
                 return False
             else :
@@ -600,6 +810,12 @@ class ShefParser :
                 tz = tz.upper()
                 if tz not in ShefParser.DateTime.TZ_OFFSETS :
                     raise ShefParser.DateTimeException(f"Invalid SHEF time zone: [{tz}]")
+            #------------------------------------------------------------------#
+            # already in the target time zone - nothing to translate (objects  #
+            # holding 24:00 are still rebuilt so they come out as 00:00 below) #
+            #------------------------------------------------------------------#
+            if (tz is self._tzinfo or tz == self._tzinfo) and not self._adjusted :
+                return self
 
             if isinstance(self._tzinfo, (timezone, ZoneInfo)) and isinstance(tz, (timezone, ZoneInfo)) :
                 dt = self._dt.astimezone(tz)
@@ -635,16 +851,17 @@ class ShefParser :
                 y -= 1
                 m += 12
             if islastday :
+                last_day = ShefParser.DateTime.last_day(y, m)
                 if end_of_month :
                     #--------------------------#
                     # set to last day of month #
                     #--------------------------#
-                    dt = ShefParser.DateTime(y, m, ShefParser.DateTime.last_day(y, m), h, n, s, tzinfo=z)
+                    dt = ShefParser.DateTime(y, m, last_day, h, n, s, tzinfo=z)
                 else :
                     #------------------------------------#
                     # don't set beyond last day of month #
                     #------------------------------------#
-                    dt = ShefParser.DateTime(y, m, min(d, ShefParser.DateTime.last_day(y, m)), h, n, s, tzinfo=z)
+                    dt = ShefParser.DateTime(y, m, min(d, last_day), h, n, s, tzinfo=z)
             else :
                 dt = ShefParser.DateTime(y, m, d, h, n, s, tzinfo=z)
             return dt
@@ -669,28 +886,19 @@ class ShefParser :
             s = second if second else self.second
             z = tzinfo if tzinfo else self._tzinfo
 
-            adjust = False
-            if h == 24 :
-                if not (n == 0 and s == 0) :
-                    raise ShefParser.DateTimeException("Cannot set hour to 24 with non-zero minute or second")
-                adjust = True
-                h = 23
-
-            self._dt = self._dt.replace(year=y, month=m, day=d, hour=h, minute=n, second=s, tzinfo=None if isinstance(z, str) else z)
-            self._tzinfo = z
-            self._adjusted = adjust
-            if self._adjusted :
-                self._dt += timedelta(hours=1)
-            dt = self
-            return ShefParser.DateTime(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, tzinfo=self._tzinfo)
+            if h == 24 and not (n == 0 and s == 0) :
+                raise ShefParser.DateTimeException("Cannot set hour to 24 with non-zero minute or second")
+            # the constructor handles hour = 24; this object is left unchanged
+            return ShefParser.DateTime(y, m, d, h, n, s, tzinfo=z)
 
         def __add__(self, other : Union[None, timedelta, MonthsDelta]) -> "ShefParser.DateTime" :
             '''
             Add a time increment (timedelta) or calendar increment (MonthsDelta)
             '''
             if not other :
-                dt = self._dt
-            elif isinstance(other, timedelta) :
+                # instances are never modified in place, so the object itself can be returned
+                return self
+            if isinstance(other, timedelta) :
                 dt = self._dt.__add__(other)
             elif isinstance(other, MonthsDelta) :
                 dt = self.add_months(other.months, other.eom)._dt
@@ -707,17 +915,15 @@ class ShefParser :
             Returns a timedelta if subtracting a DateTime, otherwise returns a DateTime
             '''
             if not other :
-                dt = self._dt
-            elif isinstance(other, timedelta) :
+                return self
+            if isinstance(other, timedelta) :
                 dt = self._dt.__sub__(other)
             elif isinstance(other, MonthsDelta) :
                 dt = self.add_months(-other.months, other.eom)._dt
             elif isinstance(other, ShefParser.DateTime) :
-                dt1 = self.astimezone('Z' if isinstance(self._tzinfo, str) else ShefParser.UTC)
-                dt1 = datetime(dt1.year, dt1.month, dt1.day, dt1.hour, dt1.minute, dt1.second)
-                dt2 = other.astimezone('Z' if isinstance(self._tzinfo, str) else ShefParser.UTC)
-                dt2 = datetime(dt2.year, dt2.month, dt2.day, dt2.hour, dt2.minute, dt2.second)
-                return dt1 - dt2
+                # both translate to the same UTC zone, so the wrapped datetimes can be subtracted directly
+                utc = 'Z' if isinstance(self._tzinfo, str) else ShefParser.UTC
+                return self.astimezone(utc)._dt - other.astimezone(utc)._dt
             else :
                 raise ShefParser.DateTimeException(f"Invalid type to add: [{other.__class__.__name__}]")
             return ShefParser.DateTime(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, tzinfo=self._tzinfo)
@@ -852,7 +1058,7 @@ class ShefParser :
             if use_prev_7am :
                 if relativetime :
                     raise ShefParser.ParseException("Cannot use relative date/time offsets with send codes QY, HY, or PY")
-                if obstime.tzinfo == ('Z' if parser.shefit_times else ShefParser.UTC) :
+                if obstime.tzinfo == parser._utc_tz_marker :
                     raise ShefParser.ParseException("Cannot use Zulu/UTC time zone with send codes QY, HY, or PY")
 
             self._parser              = parser
@@ -860,7 +1066,7 @@ class ShefParser :
             self._orig_parameter_code = orig_parameter_code
             self._obstime             = ShefParser.DateTime.clone(obstime)
             self._use_prev_7am        = use_prev_7am
-            self._relativetime        = copy.deepcopy(relativetime)
+            self._relativetime        = MonthsDelta(relativetime.months, relativetime.eom) if isinstance(relativetime, MonthsDelta) else relativetime
             self._createtime          = createtime
             self._units               = units
             self._qualifier           = qualifier
@@ -870,7 +1076,7 @@ class ShefParser :
             if not createtime :
                 dt = obstime
                 if relativetime :
-                    dt = dt.astimezone('Z' if parser.shefit_times else ShefParser.UTC) + relativetime
+                    dt = dt.astimezone(parser._utc_tz_marker) + relativetime
                 self._createtime = parser.get_creation_time(dt, createtime_str)
 
         @property
@@ -954,45 +1160,51 @@ class ShefParser :
             Create an OutputRecord from the positional info in the header and the info in the body
             '''
             parser = self._parser
-            if self._use_prev_7am :
-                if obstime_override and obstime_override._tzinfo == ('Z' if parser.shefit_times else ShefParser.UTC) :
-                    raise ShefParser.ParseException("Cannot use Zulu/UTC time zone with send codes QY, HY, or PY")
-                if relativetime_override :
-                    raise ShefParser.ParseException("Cannot use relative date/time offsets with send codes QY, HY, or PY")
-
-            shift = relativetime_override if relativetime_override is not None else self.relativetime
-            obst = obstime_override if obstime_override else self.obstime
+            utc    = parser._utc_tz_marker
+            shift  = relativetime_override if relativetime_override is not None else self._relativetime
+            obst   = obstime_override if obstime_override else self._obstime
+            zi     = obst.tzinfo
             #---------------------------------------------------------------------------#
             # adjust observation time (this order of operations is from shefit program) #
             #---------------------------------------------------------------------------#
-            # 1 - adjust to 7am or shift year, month, day (in local time)
-            if self._use_prev_7am :
+            if not (self._use_prev_7am or shift) :
+                # no adjustments, just convert to UTC
+                obst = obst.astimezone(utc)
+            elif self._use_prev_7am :
+                if obstime_override and obstime_override._tzinfo == utc :
+                    raise ShefParser.ParseException("Cannot use Zulu/UTC time zone with send codes QY, HY, or PY")
+                if relativetime_override :
+                    raise ShefParser.ParseException("Cannot use relative date/time offsets with send codes QY, HY, or PY")
+                # 1 - adjust to 7am (in local time)
                 if obst.hour < 7 :
                     obst += timedelta(days=-1) # dont use "obst -1 timedelta(days=1)" - it causes mypy to complain
                 obst = obst.replace(hour=7, minute=0, second=0)
-            elif shift :
-                if isinstance(shift, MonthsDelta) :
-                    obst = obst.add_months(shift.months)
-                else :
-                    # DON'T use shift.days!!! If shift is negative it will be incorrect as shown below.
-                    # >>> timedelta(seconds=-3600).days
-                    # -1
-                    # >>> timedelta(seconds=-3600).total_seconds()
-                    # -3600.0
-                    seconds = shift.total_seconds()
-                    days = abs(seconds) // 86400 * (-1 if seconds < 0 else 1)
-                    obst += timedelta(days=days)
-            # 2 - convert to UTC, but keep timezone for later use
-            zi = obst.tzinfo
-            obst = obst.astimezone('Z' if parser.shefit_times else ShefParser.UTC)
-            # 3 - adjust to shift hour, minutes, and seconds
-            if shift is not None and isinstance(shift, timedelta):
+                # 2 - convert to UTC
+                obst = obst.astimezone(utc)
+            elif isinstance(shift, MonthsDelta) :
+                # 1 - shift year and month (in local time)
+                obst = obst.add_months(shift.months)
+                # 2 - convert to UTC
+                obst = obst.astimezone(utc)
+            else :
+                # 1 - shift day (in local time)
+                # DON'T use shift.days!!! If shift is negative it will be incorrect as shown below.
+                # >>> timedelta(seconds=-3600).days
+                # -1
+                # >>> timedelta(seconds=-3600).total_seconds()
+                # -3600.0
+                seconds = shift.total_seconds()
+                days = abs(seconds) // 86400 * (-1 if seconds < 0 else 1)
+                obst += timedelta(days=days)
+                # 2 - convert to UTC, but keep timezone for later use
+                obst = obst.astimezone(utc)
+                # 3 - adjust to shift hour, minutes, and seconds
                 # DON'T use shift.seconds!!! If shift is negative it will be incorrect as shown below.
                 # >>> timedelta(seconds=-3600).seconds
                 # 82800
                 # >>> timedelta(seconds=-3600).total_seconds()
                 # -3600.0
-                seconds = seconds=shift.total_seconds() % (86400 if shift.total_seconds() > 0 else -86400)
+                seconds = seconds % (86400 if seconds > 0 else -86400)
                 obst += timedelta(seconds=seconds)
             #----------------------------------#
             # done adjusting observation time, #
@@ -1002,7 +1214,7 @@ class ShefParser :
             else :
                 creat = self.createtime
             if creat :
-                creat = creat.astimezone('Z' if parser.shefit_times else ShefParser.UTC)
+                creat = creat.astimezone(utc)
             if units_override == "SI" :
                 value = parser.get_english_unit_value(value, self._parameter_code)
 
@@ -1027,9 +1239,9 @@ class ShefParser :
             Get a string representation of the DotBHeaderParameterInfo object
             '''
             if self._relativetime :
-                return f"{self._parameter_code} @ {self._obstime.astimezone('Z' if self.parser.shefit_times else ShefParser.UTC)} ({self._relativetime})"
+                return f"{self._parameter_code} @ {self._obstime.astimezone(self._parser._utc_tz_marker)} ({self._relativetime})"
             else :
-                return f"{self._parameter_code} @ {self._obstime.astimezone('Z' if self.parser.shefit_times else ShefParser.UTC)}"
+                return f"{self._parameter_code} @ {self._obstime.astimezone(self._parser._utc_tz_marker)}"
 
         def __repr__(self) -> str :
             '''
@@ -1046,6 +1258,12 @@ class ShefParser :
 
         OUTPUT_FORMATS = [SHEFIT_TEXT_V1, SHEFIT_TEXT_V2]
 
+        __slots__ = (
+            "parser", "location", "parameter_code", "physical_element_code", "duration_code", "type_code",
+            "source_code", "extremum_code", "probability_code", "orig_parameter_code", "value", "qualifier",
+            "revised", "message_source", "time_series_code", "comment", "create_time", "obstime",
+            "_duration_unit", "_duration_value", "_duration_code_number", "_probability_code_number", "_param_field")
+
         def __init__(
                 self,
                 parser:              "ShefParser",
@@ -1076,325 +1294,159 @@ class ShefParser :
             if not obstime :
                 raise ShefParser.OutputException("Observed time must not be empty")
 
-            self._parser               = parser
-            self._location             = location
-            self._observation_time     = obstime
-            self._parameter_code       = parameter_code
-            self._orig_parameter_code  = orig_parameter_code
-            self._value                = en_value
-            self._qualifier            = qualifier
-            self._revised              = revised
+            self.parser                = parser
+            self.location              = location
+            self.parameter_code        = parameter_code
+            self.physical_element_code = parameter_code[:2]
+            self.duration_code         = parameter_code[2]
+            self.type_code             = parameter_code[3]   # 1st char of type & source code
+            self.source_code           = parameter_code[4]   # 2nd char of type & source code
+            self.extremum_code         = parameter_code[5]
+            self.probability_code      = parameter_code[6]
+            self.orig_parameter_code   = orig_parameter_code # as specified in the message
+            self.value                 = en_value
+            self.qualifier             = qualifier
+            self.revised               = revised
+            self.message_source        = message_source      # source of the .B message
+            self.time_series_code      = time_series_code    # 0=not time series, 1=first value, 2=other value
+            self.comment               = comment             # retained comment
             self._duration_unit        = duration_unit
             self._duration_value       = duration_value
-            self._message_source       = message_source
-            self._time_series_code     = time_series_code
-            self._comment              = comment
+            self._duration_code_number:    Optional[int]   = None # computed on first use
+            self._probability_code_number: Optional[float] = None # computed on first use
+            #----------------------------------------------#
+            # parameter code as output in shefit -1 format #
+            #----------------------------------------------#
+            if len(orig_parameter_code) == 7 :
+                if orig_parameter_code[3] == 'Z' :
+                    # replace Z type code
+                    self._param_field = f"{orig_parameter_code[:3]}R{orig_parameter_code[4:]}"
+                else :
+                    self._param_field = orig_parameter_code
+            else :
+                send_code = parser._send_codes.get(orig_parameter_code[:2])
+                if send_code and len(send_code[0]) == 7 :
+                    self._param_field = parameter_code
+                else :
+                    self._param_field = f"{parameter_code[:-1]} "
 
-            self._creation_time: Union[None, ShefParser.DateTime] = None
+            self.create_time: Union[None, ShefParser.DateTime] = None
             if create_time and isinstance(create_time, str) :
-                self._creation_time = parser.get_creation_time(obstime, create_time)
+                self.create_time = parser.get_creation_time(obstime, create_time)
             elif isinstance(create_time, ShefParser.DateTime) :
-                self._creation_time = create_time
-            self._observation_time = self._observation_time.astimezone('Z' if parser.shefit_times else ShefParser.UTC)
-            if self._creation_time :
-                self._creation_time = self._creation_time.astimezone('Z' if parser.shefit_times else ShefParser.UTC)
+                self.create_time = create_time
+            # times from .B messages are already UTC, in which case to_timezone() returns them unchanged
+            self.obstime: ShefParser.DateTime = obstime.astimezone(parser._utc_tz_marker)
+            if self.create_time :
+                self.create_time = self.create_time.astimezone(parser._utc_tz_marker)
 
         def format(self, fmt: str) -> str :
             '''
             Generate the output in the specified format
             '''
+            ot  = self.obstime
+            ct  = self.create_time
+            src = self.message_source.ljust(8) if self.message_source else "        "
             if fmt == ShefParser.OutputRecord.SHEFIT_TEXT_V1 :
                 #----------------------------#
                 # shefit -1 format (default) #
                 #----------------------------#
-                buf = StringIO()
-                buf.write(self.location.ljust(10))
-                buf.write(f"{self.obstime.year:4d}-")
-                buf.write(f"{self.obstime.month:02d}-")
-                buf.write(f"{self.obstime.day:02d} ")
-                buf.write(f"{self.obstime.hour:02d}:")
-                buf.write(f"{self.obstime.minute:02d}:")
-                buf.write(f"{self.obstime.second:02d}  ")
-                if self.create_time :
-                    buf.write(f"{self.create_time.year:4d}-")
-                    buf.write(f"{self.create_time.month:02d}-")
-                    buf.write(f"{self.create_time.day:02d} ")
-                    buf.write(f"{self.create_time.hour:02d}:")
-                    buf.write(f"{self.create_time.minute:02d}:")
-                    buf.write(f"{self.create_time.second:02d}  ")
-                else :
-                    buf.write("0000-00-00 00:00:00  ")
-                if len(self.orig_parameter_code) == 7 :
-                    if self.orig_parameter_code[3] == 'Z' :
-                        # replace Z type code
-                        buf.write(f"{self.orig_parameter_code[:3]}R{self._orig_parameter_code[4:]}")
-                    else :
-                        buf.write(self.orig_parameter_code)
+                if ct :
+                    created = f"{ct.year:4d}-{ct.month:02d}-{ct.day:02d} {ct.hour:02d}:{ct.minute:02d}:{ct.second:02d}"
                 else :
-                    output_full_parameter = False
-                    if len(self.orig_parameter_code) == 7 :
-                        output_full_parameter = True
-                    else :
-                        pe_code = self.orig_parameter_code[:2]
-                        try :
-                            param_code = self.parser._send_codes[pe_code][0]
-                            output_full_parameter = len(param_code) == 7
-                        except KeyError :
-                            pass
-                        if output_full_parameter :
-                            buf.write(self.parameter_code)
-                        else :
-                            buf.write(f"{self.parameter_code[:-1]} ")
-                buf.write(f"{self.value:15.4f}")
-                buf.write(f" {self.qualifier}")
-                buf.write(f"{self.probability_code_number:9.3f}  ")
-                buf.write(f"{self.duration_code_number:04d}")
-                buf.write(f"{self.revised:2d}")
-                buf.write(f"{self.time_series_code:2d}")
-                buf.write("  ")
-                buf.write(self.message_source.ljust(8) if self.message_source else "        ")
-                buf.write("  ")
-                if self.comment :
-                    buf.write(f'"{self.comment[1:-1]}"')
-                else :
-                    buf.write('" "')
-                rec = buf.getvalue()
-                buf.close()
+                    created = "0000-00-00 00:00:00"
+                rec = (
+                    f"{self.location.ljust(10)}"
+                    f"{ot.year:4d}-{ot.month:02d}-{ot.day:02d} {ot.hour:02d}:{ot.minute:02d}:{ot.second:02d}  "
+                    f"{created}  "
+                    f"{self._param_field}"
+                    f"{self.value:15.4f} {self.qualifier}{self.probability_code_number:9.3f}  "
+                    f"{self.duration_code_number:04d}{self.revised:2d}{self.time_series_code:2d}  "
+                    f"{src}  "
+                    f'"{self.comment[1:-1] if self.comment else " "}"')
             elif fmt == ShefParser.OutputRecord.SHEFIT_TEXT_V2 :
                 #------------------#
                 # shefit -2 output #
                 #------------------#
-                buf = StringIO()
-                buf.write(self.location.ljust(8))
-                buf.write(f"{self.obstime.year:4d}")
-                buf.write(f"{self.obstime.month:2d}")
-                buf.write(f"{self.obstime.day:2d}")
-                buf.write(f"{self.obstime.hour:2d}")
-                buf.write(f"{self.obstime.minute:2d}")
-                buf.write(f"{self.obstime.second:2d}")
-                buf.write(' ')
-                if self.create_time :
-                    buf.write(f"{self.create_time.year:4d}")
-                    buf.write(f"{self.create_time.month:2d}")
-                    buf.write(f"{self.create_time.day:2d}")
-                    buf.write(f"{self.create_time.hour:2d}")
-                    buf.write(f"{self.create_time.minute:2d}")
-                    buf.write(f"{self.create_time.second:2d}")
+                if ct :
+                    created = f"{ct.year:4d}{ct.month:2d}{ct.day:2d}{ct.hour:2d}{ct.minute:2d}{ct.second:2d}"
                 else :
-                    buf.write("   0 0 0 0 0 0")
-                buf.write(self.physical_element_code.rjust(3))
-                buf.write(self.type_code.rjust(2))
-                buf.write(self.source_code)
-                buf.write(self.extremum_code)
-                buf.write(f"{self.value:10.3f}")
-                buf.write(self.qualifier.rjust(2))
-                buf.write(f"{self.probability_code_number:6.2f}")
-                buf.write(f"{self.duration_code_number:5d}")
-                buf.write(f"{self.revised:2d}")
-                buf.write(' ')
-                buf.write(self.message_source.ljust(8) if self.message_source else "        ")
-                buf.write(f"{self.time_series_code}")
+                    created = "   0 0 0 0 0 0"
+                rec = (
+                    f"{self.location.ljust(8)}"
+                    f"{ot.year:4d}{ot.month:2d}{ot.day:2d}{ot.hour:2d}{ot.minute:2d}{ot.second:2d} "
+                    f"{created}"
+                    f"{self.physical_element_code.rjust(3)}{self.type_code.rjust(2)}{self.source_code}{self.extremum_code}"
+                    f"{self.value:10.3f}{self.qualifier.rjust(2)}"
+                    f"{self.probability_code_number:6.2f}{self.duration_code_number:5d}{self.revised:2d} "
+                    f"{src}{self.time_series_code}")
                 if self.comment :
-                    buf.write(f'\n        "{self.comment[1:-1]}"')
-                rec = buf.getvalue()
-                buf.close()
+                    rec += f'\n        "{self.comment[1:-1]}"'
             else :
                 raise ShefParser.OutputException(f'Invalid output format: "[{fmt}]"')
             return rec
 
-        @property
-        def parser(self) -> "ShefParser" :
-            '''
-            Get the ShefParser object that created this record
-            '''
-            return self._parser
-
-        @property
-        def location(self) -> str:
-            '''
-            Get the location
-            '''
-            return self._location
-
-        @property
-        def obstime(self) -> "ShefParser.DateTime" :
-            '''
-            Get the observation time
-            '''
-            return self._observation_time
-
-        @property
-        def create_time(self) -> Union[None, "ShefParser.DateTime"] :
-            '''
-            Get the creation time
-            '''
-            return self._creation_time
-
-        @property
-        def physical_element_code(self) -> str :
-            '''
-            Get the physical element code
-            '''
-            return self._parameter_code[:2]
-
-        @property
-        def duration_code(self) -> str :
-            '''
-            Get the parameter code
-            '''
-            return self._parameter_code[2]
-
         @property
         def duration_code_number(self) -> int :
             '''
             Get the numeric value of the duration code
             '''
-            if self.duration_code == 'V' :
-                if self._duration_unit and self._duration_value is not None and self._duration_unit != 'Z' :
-                    return ShefParser.DURATION_VARIABLE_CODES[self._duration_unit] + self._duration_value
-                raise ShefParser.OutputException(f"No duration specified for parameter code [{self.parameter_code}]")
-            else :
-                if self.duration_code == 'Z' :
-                    if self.physical_element_code in ShefParser.DEFAULT_DURATION_CODES :
-                        return ShefParser.DURATION_CODES[ShefParser.DEFAULT_DURATION_CODES[self.physical_element_code]]
-                    else :
-                        return ShefParser.DURATION_CODES[self.duration_code]
+            if self._duration_code_number is None :
+                if self.duration_code == 'V' :
+                    if not (self._duration_unit and self._duration_value is not None and self._duration_unit != 'Z') :
+                        raise ShefParser.OutputException(f"No duration specified for parameter code [{self.parameter_code}]")
+                    self._duration_code_number = ShefParser.DURATION_VARIABLE_CODES[self._duration_unit] + self._duration_value
+                elif self.duration_code == 'Z' and self.physical_element_code in ShefParser.DEFAULT_DURATION_CODES :
+                    self._duration_code_number = ShefParser.DURATION_CODES[ShefParser.DEFAULT_DURATION_CODES[self.physical_element_code]]
                 else :
-                    return ShefParser.DURATION_CODES[self.duration_code]
-
-        @property
-        def parameter_code(self) -> str :
-            '''
-            Get the parameter code
-            '''
-            return self._parameter_code
-
-        @property
-        def type_code(self) -> str :
-            '''
-            Get the type code (1st char of type & source code)
-            '''
-            return self._parameter_code[3]
-
-        @property
-        def source_code(self) -> str :
-            '''
-            Get the source code (2nd char of the type & source code)
-            '''
-            return self._parameter_code[4]
-
-        @property
-        def extremum_code(self) -> str :
-            '''
-            Get the extremum code
-            '''
-            return self._parameter_code[5]
-
-        @property
-        def probability_code(self) -> str :
-            '''
-            Get the probability code
-            '''
-            return self._parameter_code[6]
+                    self._duration_code_number = ShefParser.DURATION_CODES[self.duration_code]
+            return self._duration_code_number
 
         @property
         def probability_code_number(self) -> float :
             '''
             Get the numeric value of the probability code
             '''
-            return float(ShefParser.PROBABILITY_CODES[self._parameter_code[6]])
-
-        @property
-        def orig_parameter_code(self) -> str :
-            '''
-            Get the parameter code as specified in the message
-            '''
-            return self._orig_parameter_code
-
-        @property
-        def value(self) -> float :
-            '''
-            Get the value
-            '''
-            return self._value
-
-        @property
-        def qualifier(self) -> str :
-            '''
-            Get the data qualifier (default or otherwise)
-            '''
-            return self._qualifier
-
-        @property
-        def revised(self) -> bool :
-            '''
-            Is the revision flag set?
-            '''
-            return self._revised
-
-        @property
-        def message_source(self) -> Union[None, str] :
-            '''
-            Get the source of the .B message
-            '''
-            return self._message_source
-
-        @property
-        def time_series_code(self) -> int :
-            '''
-            Get the time series code (0=not time series, 1=first value, 2=other value)
-            '''
-            return self._time_series_code
-
-        @property
-        def comment(self) -> Union[None, str] :
-            '''
-            Get the retained comment
-            '''
-            return self._comment
+            if self._probability_code_number is None :
+                self._probability_code_number = ShefParser.PROBABILITY_CODES[self.probability_code]
+            return self._probability_code_number
 
     @staticmethod
     def write_shefparm_data(output_object: Union[TextIO, str]) -> None :
         '''
         Write SHEFPARM data to the specified output
         '''
-        out = None
-        if isinstance(output_object, (BufferedRandom, TextIOWrapper)) :
-            out = output_object
-        elif isinstance(output_object, str) :
+        if isinstance(output_object, str) :
             out = open(output_object, "w")
+        elif hasattr(output_object, "write") :
+            out = output_object
         else :
-            raise ShefParser.OutputException(f"Expected BufferedRandom or str object, got [{output_object.__class__.__name__}]")
-        out.write(f"$\n$ This file generated on {str(datetime.now())[:-7]} by {progname} version {version} ({version_date})\n$\n")
-        out.write("SHEFPARM\n")
-        out.write("*1                      PE CODES AND CONVERSION FACTORS\n")
-        # get the non-send codes
-        conversions = dict(ShefParser.PE_CONVERSIONS)
-        # add in the send codes
-        for code in ShefParser.SEND_CODES :
-            conversions[code] = conversions[ShefParser.SEND_CODES[code][0][:2]]
-        for code in sorted(conversions) :
-            out.write(f"{code} {conversions[code]}\n")
-        out.write("*2                      DURATION CODES AND ASSOCIATED VALUES\n")
-        for code in sorted(ShefParser.DURATION_CODES) :
-            out.write(f"{code}   {ShefParser.DURATION_CODES[code]:04d}\n")
-        out.write("*3                      TS CODES\n")
-        for code in sorted(ShefParser.TS_CODES) :
-            out.write(f"{code}  1\n")
-        out.write("*4                      EXTREMUM CODES\n")
-        for code in sorted(ShefParser.EXTREMUM_CODES) :
-            out.write(f"{code}   1\n")
-        out.write("*5                      PROBILITY CODES AND ASSOCIATED VALUES\n")
-        for code in sorted(ShefParser.PROBABILITY_CODES) :
-            out.write(f"{code} {ShefParser.PROBABILITY_CODES[code]}\n")
-        out.write("*6                      SEND CODES OR DURATION DEFAULTS OTHER THAN I\n")
-        for code in sorted(ShefParser.SEND_CODES) :
-            out.write(f"{code} {ShefParser.SEND_CODES[code][0].ljust(7)}")
-            out.write("  1\n" if ShefParser.SEND_CODES[code][1] else "\n")
-        out.write("*7                      DATA QUALIFIER CODES\n")
-        for code in sorted(ShefParser.QUALIFIER_CODES) :
-            out.write(f"{code}\n")
-        out.write("**                      MAX NUMBER OF ERRORS (I4 FORMAT)\n 500\n**\n")
+            raise ShefParser.OutputException(f"Expected writable stream or str object, got [{output_object.__class__.__name__}]")
+        pe_conversions, send_codes = ShefParser.PE_CONVERSIONS, ShefParser.SEND_CODES
+        # the non-send codes plus the send codes, which take the conversion of the PE code they send
+        conversions = [(code, value) for code, value in pe_conversions.items() if code not in send_codes]
+        conversions.extend((code, pe_conversions[parameter_code[:2]]) for code, (parameter_code, _) in send_codes.items())
+        conversions.sort()
+        parts = [f"$\n$ This file generated on {str(datetime.now())[:-7]} by {progname} version {version} ({version_date})\n$\n"]
+        parts.append("SHEFPARM\n")
+        parts.append("*1                      PE CODES AND CONVERSION FACTORS\n")
+        parts.extend(f"{code} {value}\n" for code, value in conversions)
+        parts.append("*2                      DURATION CODES AND ASSOCIATED VALUES\n")
+        parts.extend(f"{code}   {value:04d}\n" for code, value in sorted(ShefParser.DURATION_CODES.items()))
+        parts.append("*3                      TS CODES\n")
+        parts.extend(f"{code}  1\n" for code in sorted(ShefParser.TS_CODES))
+        parts.append("*4                      EXTREMUM CODES\n")
+        parts.extend(f"{code}   1\n" for code in sorted(ShefParser.EXTREMUM_CODES))
+        parts.append("*5                      PROBILITY CODES AND ASSOCIATED VALUES\n")
+        parts.extend(f"{code} {value}\n" for code, value in sorted(ShefParser.PROBABILITY_CODES.items()))
+        parts.append("*6                      SEND CODES OR DURATION DEFAULTS OTHER THAN I\n")
+        parts.extend(
+            f"{code} {parameter_code.ljust(7)}{'  1' if prev_0700 else ''}\n"
+            for code, (parameter_code, prev_0700) in sorted(ShefParser.SEND_CODES.items()))
+        parts.append("*7                      DATA QUALIFIER CODES\n")
+        parts.extend(f"{code}\n" for code in sorted(ShefParser.QUALIFIER_CODES))
+        parts.append("**                      MAX NUMBER OF ERRORS (I4 FORMAT)\n 500\n**\n")
+        out.write("".join(parts))
         if isinstance(output_object, str) :
             out.close()
 
@@ -1404,39 +1456,17 @@ class ShefParser :
         Replaces whitespace chars (' ', '\t') in quotes with non-whitespace characters (NUL, SOH)
         to allow split() to not break quotes.
         '''
-        NUL, SOH = chr(0), chr(1)
-        quote = None
-        with StringIO() as buf :
-            for c in s :
-                if quote :
-                    if c == ' ' :
-                        buf.write(NUL)
-                    elif c == '\t' :
-                        buf.write(SOH)
-                    else :
-                        buf.write(c)
-                    if c == quote :
-                        quote = None
-                else :
-                    buf.write(c)
-                    if c in "'\"" : quote = c
-            return buf.getvalue()
+        if '"' not in s and "'" not in s :
+            return s
+        return ShefParser.QUOTED_TEXT_PATTERN.sub(lambda m : m.group(0).translate(ShefParser.HIDE_WHITESPACE), s)
 
     @staticmethod
     def unhide_quoted_whitespace(s: str) -> str :
         '''
         Restored replaced whitespace chars in quotes with original characters
         '''
-        NUL, SOH = chr(0), chr(1)
-        with StringIO() as buf :
-            for c in s :
-                if c == NUL :
-                    buf.write(' ')
-                elif c == SOH :
-                    buf.write('\t')
-                else :
-                    buf.write(c)
-            return buf.getvalue()
+        return s.translate(ShefParser.UNHIDE_WHITESPACE)
+
     def __init__(self, output_format: int, shefparm_pathname: Union[None, str]=None, shefit_times: bool=False, reject_problematic: bool=False) :
         '''
         ShefParser Constructor
@@ -1444,23 +1474,34 @@ class ShefParser :
         self._shefparm_pathname:    Union[None, str] = shefparm_pathname
         self._output_format:        str  = ShefParser.OutputRecord.OUTPUT_FORMATS[output_format-1]
         self._shefit_times:         bool = shefit_times
+        self._utc_tz_marker:        Union[str, ZoneInfo] = 'Z' if shefit_times else ShefParser.UTC
         self._reject_problematic:   bool = reject_problematic
         self._message:              Union[None, str] = None
         self._message_location:     Union[None, int] = None
         self._log_line_len:         int = 100
         self._previous_raw_message: Union[None, str] = None
         self._raw_message:          Union[None, str] = None
-        #-----------------------------#
-        # initialize program defaults #
-        #-----------------------------#
-        self._pe_conversions              = copy.deepcopy(ShefParser.PE_CONVERSIONS)
-        self._send_codes                  = copy.deepcopy(ShefParser.SEND_CODES)
+        self._raw_message_lines:    Union[None, list[str]] = None
+        #-----------------------------------------------------------------------#
+        # initialize program defaults                                           #
+        #                                                                       #
+        # the code tables are shared with the class until a SHEFPARM file       #
+        # modifies one, at which point the set_..._code() method copies it      #
+        #-----------------------------------------------------------------------#
+        self._pe_conversions              = ShefParser.PE_CONVERSIONS
+        self._pe_unit_conversions         = ShefParser.PE_UNIT_CONVERSIONS
+        self._send_codes                  = ShefParser.SEND_CODES
         self._addional_pe_codes:          set[str] = set() # any extra PE codes recognized by a loader
-        self._duration_codes              = copy.deepcopy(ShefParser.DURATION_CODES)
-        self._ts_codes                    = copy.deepcopy(ShefParser.TS_CODES)
-        self._extremum_codes              = copy.deepcopy(ShefParser.EXTREMUM_CODES)
-        self._probability_codes           = copy.deepcopy(ShefParser.PROBABILITY_CODES)
-        self._qualifier_codes             = copy.deepcopy(ShefParser.QUALIFIER_CODES)
+        self._recognized_pe_codes         = frozenset(ShefParser.PE_CONVERSIONS) # PE codes plus any extra PE codes
+        self._duration_codes              = ShefParser.DURATION_CODES
+        self._ts_codes                    = ShefParser.TS_CODES
+        self._extremum_codes              = ShefParser.EXTREMUM_CODES
+        self._probability_codes           = ShefParser.PROBABILITY_CODES
+        self._qualifier_codes             = ShefParser.QUALIFIER_CODES
+        self._parameter_codes:            dict[str, tuple[str, bool]] = {} # get_parameter_code() results by partial code
+        self._current_times:              dict[Any, tuple[float, ShefParser.DateTime]] = {} # (expiry, current_time() result) by time zone
+        self._time_zones:                 dict[str, Union[str, timezone, ZoneInfo]] = {} # get_time_zone() results by name
+        self._header_dates:               dict[tuple, tuple] = {} # (current date, parse_header_date() result) by arguments
         self._max_error_count:            int  = 1500 # May be modified by SHEFPARM file
         self._error_count:                int = 0
         self._warning_count:              int = 0
@@ -1475,73 +1516,19 @@ class ShefParser :
         self._default_probability_code    = 'Z' # May not be modified by SHEFPARM file
         self._input:                      Union[None, TextIOWrapper] = None
         self._input_name:                 Union[None, str] = None
+        self._input_batch_size:           int = 1 # lines to read at a time from the input device
         self._line_number                 = 0
         self._output:                     Union[None, BufferedRandom, TextIOWrapper] = None
         self._output_name:                Union[None, str] = None
+        self._write_output:               Union[None, Callable[[str], Any]] = None # writes text to the output device
         self._input_lines:                deque = deque()
-        self._msg_start_pattern           = re.compile(r"^\.[ABE]R?\s", re.I)
-        self._msg_continue_patterns       = {'A' : (re.compile(r"^\.A\d{1,2}", re.I), re.compile(r"^\.AR?\d{1,2}", re.I)),
-                                             'E' : (re.compile(r"^\.E\d{1,2}", re.I), re.compile(r"^\.ER?\d{1,2}", re.I)),
-                                             'B' : (re.compile(r"^\.B\d{1,2}", re.I), re.compile(r"^\.BR?\d{1,2}", re.I))}
-        self._positional_fields_pattern    = re.compile(
-                                            # 1 = location id
-                                            # 2 = date-time
-                                            # 6 = time zone
-                                            #                 1           23       4
-                                               r"^\.[AEB]R?\s+(\w{3,8})\s+((\d{2})?(\d{2})?\d{4})" \
-                                            #    5   6
-                                               r"(\s+([NAECMPYLHB][DS]?|[JZ]))?\s+?", re.I|re.M)
-        self._dot_b_header_lines_pattern  = re.compile(r"^.B(R?)\s.+?$(\n^.B\1?\d\s.+?$)*", re.I|re.M)
-        self._dot_b_body_line_pattern     = re.compile(r"^(\w{3,8})\s+\S+.*$")
-        self._obs_time_pattern            = re.compile(
-                                            # 1 = date/time
-                                            # 2 = date/time code
-                                            # 3 = date/time value
-                                            #    12                           3
-                                               r"(D[SNHDMYJT]|DR[SNHDMYE][+-]?)(\d+)", re.I)
-        self._multiple_obs_time_pattern   = re.compile(
-                                            # 1 = first date/time
-                                            # 2 = first date/time code
-                                            # 3 = first date/time value
-                                            # 4 = next data
-                                            # 5 = separator
-                                            # 6 = next date/time code
-                                            # 7 = next date/time value
-                                            #    12                            3     45      6                           7
-                                               r"((D[SNHDMYJT]|DR[SNHDMYE][+-]?)(\d+))((\s+|/)(D[SNHDMYJT]|DR[SNHDMYE][+-])(\d+))+?", re.I)
-        self._obs_time_pattern2           = re.compile(
-                                            # 1 = first date/time
-                                            # 2 = first date/time code
-                                            # 3 = first date/time value
-                                            # 4 = next data
-                                            # 5 = next date/time code
-                                            # 6 = next date/time value
-                                            #    12                        3          4 5                        6
-                                               r"((D[SNHDMYJT]|DR[SNHDMYE])([+-]?\d+))(@(D[SNHDMYJT]|DR[SNHDMYE])([+-]?\d+))*?", re.I)
-        self._create_time_pattern         = re.compile(r"DC\d+", re.I)
-        self._unit_system_pattern         = re.compile(r"DU[ES]", re.I)
-        self._data_qualifier_pattern      = re.compile(r"DQ.", re.I)
-        self._duration_code_pattern       = re.compile(r"(DV[SNHDMY]\d{1,2}|DVZ)", re.I)
-        self._parameter_code_pattern      = re.compile(r"^[A-CE-IL-NP-Y][A-Z](([A-Z]([A-Z0-9]{2})?[A-Z]{1,2})?)?", re.I)
-        self._interval_pattern            = re.compile(r"DI[SNHDMEY][+-]?\d{1,2}", re.I)
-        self._value_pattern               = re.compile(
-                                           # 1 = value
-                                           # 2 = numeric value
-                                           # 3 = trace value
-                                           # 4 = missing valule
-                                           # 5 = value qualifier
-                                           #     1 2                              3    4                 5
-                                               r"(^([+-]?(?:\d+(?:\.\d*)?|\.\d+))|(T+)|([M.+-]+|\+{1,2}))([A-Z]?$)", re.I)
-        self._retained_comment_pattern    = re.compile(r"(([\"']).+(\2|$))")
-        self._replacement_strip_pattern   = re.compile("^["+chr(0)+chr(9)+"]+|["+chr(0)+chr(9)+"]+$")
-        self._replacement_split_pattern   = re.compile('['+chr(0)+chr(9)+']')
-
         if self._shefparm_pathname :
             self.read_shefparm(self._shefparm_pathname)
             
-        self._duration_ids = {}
-        for key in self._duration_codes :
-            self._duration_ids[self._duration_codes[key]] = key
+        if self._duration_codes is ShefParser.DURATION_CODES :
+            self._duration_ids = ShefParser.DURATION_IDS
+        else :
+            self._duration_ids = {v : k for k, v in self._duration_codes.items()}
 
     @property
     def shefit_times(self) -> bool :
@@ -1550,6 +1537,15 @@ class ShefParser :
         '''
         return self._shefit_times
 
+    @property
+    def raw_message(self) -> Union[None, str] :
+        '''
+        Get the unmodified text of the current message. The lines are only joined when this is first requested.
+        '''
+        if self._raw_message is None and self._raw_message_lines is not None :
+            self._raw_message = '\n'.join(self._raw_message_lines)
+        return self._raw_message
+
     def read_shefparm(self, shefparm_pathname: str) -> None :
         '''
         modify program defaults with content of SHEFPARM file
@@ -1574,36 +1570,37 @@ class ShefParser :
             '7' : {"name" : "DATA QUALIFIER CODES", "func" : self.set_qualifier_code,   "visited" : False},
             '*' : {"name" : "MAX ERROR COUNT",      "func" : self.set_max_error_count,  "visited" : False}}
         section = None
+        info    = None # section_info entry for the current section
         p = Path(shefparm_pathname)
         if not p.exists() or p.is_dir() :
             self.critical(f"No such file: [{shefparm_pathname}]")
         #------------------------#
         # read and process lines #
         #------------------------#
-        with p.open() as f : lines = f.read().strip().split('\n')
-        for i in range(len(lines)) :
-            line = lines[i]
-            if not line or line[0] == '$' or line.upper().startswith("SHEFPARM") :
+        for i, line in enumerate(p.read_text().splitlines()) :
+            first = line[:1]
+            if not first or first == '$' or (first in "Ss" and line[:8].upper() == "SHEFPARM") :
                 #-------------#
                 # ignore line #
                 #-------------#
                 continue
-            if line[0] == '*' :
+            if first == '*' :
                 #---------------------#
                 # section marker line #
                 #---------------------#
-                try    : section = line[1]
-                except : self.critical(f"{shefparm_pathname}: Invalid line at line {i+1}: [{line}]")
+                if len(line) < 2 :
+                    self.critical(f"{shefparm_pathname}: Invalid line at line {i+1}: [{line}]")
+                section = line[1]
                 if section not in section_info :
                     self.critical(f'{shefparm_pathname}: Unexpected section "[{section}]" at line {i+1}')
-            elif section is not None :
+                info = section_info[section]
+                func = info["func"]
+            elif info is not None :
                 #--------------------------------------#
                 # process line for appropriate section #
                 #--------------------------------------#
-                func = section_info[section]["func"]
-                assert isinstance(func, types.MethodType)
                 func(line)
-                section_info[section]["visited"] = True
+                info["visited"] = True
             else :
                 #------------#
                 # unexpected #
@@ -1620,7 +1617,10 @@ class ShefParser :
         '''
         Update PE codes from SHEFPARM line
         '''
-        key, value = line[0:2], float(line[3:23].strip())
+        key, value = line[0:2], float(line[3:23])
+        if self._pe_conversions is ShefParser.PE_CONVERSIONS :
+            self._pe_conversions = dict(ShefParser.PE_CONVERSIONS)
+            self._pe_unit_conversions = dict(ShefParser.PE_UNIT_CONVERSIONS)
         if key not in self._pe_conversions :
             if key  not in self._send_codes :
                 self.info(f"{self._shefparm_pathname}: Adding non-standard physical element code [{key}] with conversion factor [{value}]")
@@ -1630,42 +1630,52 @@ class ShefParser :
             else :
                 self.warning(f"{self._shefparm_pathname}: Updating standard physical element code [{key}] conversion factor from [{self._pe_conversions[key]}] to [{value}]")
         self._pe_conversions[key] = value
+        self._pe_unit_conversions[key] = (1.8, 32.) if value == -1 else (value, 0.)
+        self._recognized_pe_codes = self._recognized_pe_codes | {key}
+        # resolved parameter codes may no longer be valid
+        self._parameter_codes.clear()
 
     def get_recognized_pe_codes(self) -> set :
         '''
         Return the set of recognized PE codes
         '''
-        return set(self._pe_conversions.keys()).union(self._addional_pe_codes)
+        return set(self._recognized_pe_codes)
 
     def set_additional_pe_codes(self, additional_pe_codes: set) -> None :
         '''
         Add to the set of recognized PE codes
         '''
         recognozed_pe_codes = self.get_recognized_pe_codes()
-        for additional_pe_code in [x for x in sorted(additional_pe_codes) if x not in recognozed_pe_codes] :
+        for additional_pe_code in sorted(additional_pe_codes - recognozed_pe_codes) :
             self.info(f"PE code [{additional_pe_code}] is now recognized and will not generate any warning messages")
             self._addional_pe_codes.add(additional_pe_code)
+        self._recognized_pe_codes = self._recognized_pe_codes.union(self._addional_pe_codes)
 
     def set_duration_code(self, line: str) -> None :
         '''
         Update Duration codes from SHEFPARM line
         '''
         key, valstr = line[0], line[3:8].strip()
-        try :
-            value: int = int(valstr)
-        except :
-            self.critical(f"Cannot use non-integer value [{value}] for duration code [{key}]")
+        if not ShefParser._signed_integer_pattern.fullmatch(valstr) :
+            self.critical(f"Cannot use non-integer value [{valstr}] for duration code [{key}]")
+        value = int(valstr)
+        if self._duration_codes is ShefParser.DURATION_CODES :
+            self._duration_codes = dict(ShefParser.DURATION_CODES)
         if key not in self._duration_codes :
             self.info(f"{self._shefparm_pathname}: Adding non-standard duration code [{key}] with numerical value [{value}]")
         elif value != int(self._duration_codes[key]) :
             self.warning(f"{self._shefparm_pathname}: Updating standard duration code [{key}] numerical value from [{self._duration_codes[key]}] to [{value}]")
         self._duration_codes[key] = value
+        # resolved parameter codes may no longer be valid
+        self._parameter_codes.clear()
 
     def set_ts_code(self, line: str) -> None :
         '''
         Update TS codes from SHEFPARM line
         '''
-        key, value = line[0:2], int(line[3:5].strip()) if len(line) > 3 else 0
+        key, value = line[0:2], int(line[3:5]) if len(line) > 3 else 0
+        if self._ts_codes is ShefParser.TS_CODES :
+            self._ts_codes = set(ShefParser.TS_CODES)
         if value :
             if key not in self._ts_codes :
                 self.info(f"{self._shefparm_pathname}: Adding non-standard type-and-source code [{key}]")
@@ -1674,12 +1684,16 @@ class ShefParser :
             if key in self._ts_codes :
                 self.warning(f"{self._shefparm_pathname}: Disabling standard type-and-source code [{key}]")
                 self._ts_codes.remove(key)
+        # resolved parameter codes may no longer be valid
+        self._parameter_codes.clear()
 
     def set_extremum_code(self, line: str) -> None :
         '''
         Update Extremum codes from SHEFPARM line
         '''
-        key, value = line[0:1], int(line[3:5].strip()) if len(line) > 3 else 0
+        key, value = line[0:1], int(line[3:5]) if len(line) > 3 else 0
+        if self._extremum_codes is ShefParser.EXTREMUM_CODES :
+            self._extremum_codes = set(ShefParser.EXTREMUM_CODES)
         if value :
             if key not in self._extremum_codes :
                 self.info(f"{self._shefparm_pathname}: Adding non-standard extremum code [{key}]")
@@ -1688,23 +1702,31 @@ class ShefParser :
             if key in self._extremum_codes :
                 self.warning(f"{self._shefparm_pathname}: Disabling standard extremum code [{key}]")
                 self._extremum_codes.remove(key)
+        # resolved parameter codes may no longer be valid
+        self._parameter_codes.clear()
 
     def set_probability_code(self, line: str) -> None :
         '''
         Update Probability codes from SHEFPARM line
         '''
-        key, value = line[0], float(line[2:22].strip())
+        key, value = line[0], float(line[2:22])
+        if self._probability_codes is ShefParser.PROBABILITY_CODES :
+            self._probability_codes = dict(ShefParser.PROBABILITY_CODES)
         if key not in self._probability_codes :
             self.info(f"{self._shefparm_pathname}: Adding non-standard probability code [{key}] with conversion factor [{value}]")
         elif value != self._probability_codes[key] :
             self.warning(f"{self._shefparm_pathname}: Updating standard probability code [{key}] conversion factor from [{self._probability_codes[key]}] to [{value}]")
         self._probability_codes[key] = value
+        # resolved parameter codes may no longer be valid
+        self._parameter_codes.clear()
 
     def set_send_code(self, line: str) -> None :
         '''
         Update Send codes from SHEFPARM line
         '''
         key, value = line[0:2], (line[3:10], len(line) > 12 and line[12] == '1')
+        if self._send_codes is ShefParser.SEND_CODES :
+            self._send_codes = dict(ShefParser.SEND_CODES)
         if key not in self._send_codes :
             self.info(f"{self._shefparm_pathname}: Adding non-standard send code [{key}] with parmameter [{value[0]}] and use-prev-0700 = [{value[1]}]")
         elif value != self._send_codes[key] :
@@ -1713,6 +1735,8 @@ class ShefParser :
                 f"{self._shefparm_pathname}: Updating standard send code [{key}] from parmameter [{cur_val[0]}] and use-prev-0700 = [{cur_val[1]}] " \
                     f"to parmameter [{value[0]}] and use-prev-0700 = [{value[1]}]")
         self._send_codes[key] = value
+        # resolved parameter codes may no longer be valid
+        self._parameter_codes.clear()
 
     def set_qualifier_code(self, line: str) -> None :
         '''
@@ -1721,9 +1745,13 @@ class ShefParser :
         key = line[0]
         if len(key) != 1 or not key.isalpha() or key != key.upper() or key in ("IO") :
             self.critical(f"{self._shefparm_pathname}: Invalid ata qualifier [{key}]")
+        if self._qualifier_codes is ShefParser.QUALIFIER_CODES :
+            self._qualifier_codes = set(ShefParser.QUALIFIER_CODES)
         if key not in self._qualifier_codes :
             self.info(f"{self._shefparm_pathname}: Adding non-standard data qualifier code [{key}]")
             self._qualifier_codes.add(key)
+        # resolved parameter codes may no longer be valid
+        self._parameter_codes.clear()
 
     def set_max_error_count(self, line: str) -> None :
         '''
@@ -1740,43 +1768,47 @@ class ShefParser :
         '''
         logger.debug(message_text)
 
-    def info(self, message_text: str) -> None :
+    def wrap_log_text(self, text: str) -> str :
         '''
-        Log info message.
+        Wrap text to the log line length, indenting continuation lines
         '''
-        if self._raw_message is not None :
-            lines = textwrap.wrap(f"{message_text} in message starting at {self._input_name}:{self._message_location}", width=self._log_line_len)
-            logger.info("\n\t".join(lines))
-            if self._raw_message != self._previous_raw_message :
-                logger.info("Warning is for message :\n\t{}".format("\n\t".join(self._raw_message.split('\n'))))
-            else :
-                logger.info("Warning is for message logged above")
-            self._previous_raw_message = self._raw_message
-        else :
+        if len(text) <= self._log_line_len and text.isprintable() and text[-1:] != ' ' :
+            # textwrap.wrap() would return the text as a single unchanged line
+            return text
+        return "\n\t".join(textwrap.wrap(text, width=self._log_line_len))
+
+    def log_message(self, level: int, message_text: str, message_label: str, suffix: str="") -> None :
+        '''
+        Log a message with its location, plus the raw SHEF message it is for, if any.
+        Nothing is formatted for levels the logger would discard.
+        '''
+        if self._raw_message_lines is not None :
+            raw_message = self.raw_message
+            if logger.isEnabledFor(level) :
+                logger.log(level, self.wrap_log_text(f"{message_text} in message starting at {self._input_name}:{self._message_location}{suffix}"))
+            if logger.isEnabledFor(logging.INFO) :
+                if raw_message != self._previous_raw_message :
+                    logger.info("{} :\n\t{}".format(message_label, "\n\t".join(self._raw_message_lines)))
+                else :
+                    logger.info(f"{message_label} logged above")
+            self._previous_raw_message = raw_message
+        elif logger.isEnabledFor(level) :
             if self._input_name is None :
-                lines = textwrap.wrap(message_text, width=self._log_line_len)
+                logger.log(level, self.wrap_log_text(message_text))
             else :
-                lines = textwrap.wrap(f"{message_text} at {self._input_name}:{self._line_number}", width=self._log_line_len)
-            logger.info("\n\t".join(lines))
+                logger.log(level, self.wrap_log_text(f"{message_text} at {self._input_name}:{self._line_number}"))
+
+    def info(self, message_text: str) -> None :
+        '''
+        Log info message.
+        '''
+        self.log_message(logging.INFO, message_text, "Warning is for message")
 
     def warning(self, message_text: str) -> None :
         '''
         Log and track warnings.
         '''
-        if self._raw_message is not None :
-            lines = textwrap.wrap(f"{message_text} in message starting at {self._input_name}:{self._message_location}", width=self._log_line_len)
-            logger.warning("\n\t".join(lines))
-            if self._raw_message != self._previous_raw_message :
-                logger.info("Warning is for message :\n\t{}".format("\n\t".join(self._raw_message.split('\n'))))
-            else :
-                logger.info("Warning is for message logged above")
-            self._previous_raw_message = self._raw_message
-        else :
-            if self._input_name is None :
-                lines = textwrap.wrap(message_text, width=self._log_line_len)
-            else :
-                lines = textwrap.wrap(f"{message_text} at {self._input_name}:{self._line_number}", width=self._log_line_len)
-            logger.warning("\n\t".join(lines))
+        self.log_message(logging.WARNING, message_text, "Warning is for message")
         self._warning_count += 1
         if self._message != self._last_message_with_warning :
             self._messages_with_warning_count += 1
@@ -1786,20 +1818,7 @@ class ShefParser :
         '''
         Log and track errors. Abort if max errors exceeded.
         '''
-        if self._raw_message is not None :
-            lines = textwrap.wrap(f"{message_text} in message starting at {self._input_name}:{self._message_location}", width=self._log_line_len)
-            logger.error("\n\t".join(lines))
-            if self._raw_message != self._previous_raw_message :
-                logger.info("Error is in message :\n\t{}".format("\n\t".join(self._raw_message.split('\n'))))
-            else :
-                logger.info("Error is in message logged above")
-            self._previous_raw_message = self._raw_message
-        else :
-            if self._input_name is None :
-                lines = textwrap.wrap(message_text, width=self._log_line_len)
-            else :
-                lines = textwrap.wrap(f"{message_text} at {self._input_name}:{self._line_number}", width=self._log_line_len)
-            logger.error("\n\t".join(lines))
+        self.log_message(logging.ERROR, message_text, "Error is in message")
         if count_error :
             self._error_count += 1
             if self._message != self._last_message_with_error :
@@ -1814,27 +1833,31 @@ class ShefParser :
         '''
         Log critical error and abort.
         '''
-        if self._raw_message is not None :
-            lines = textwrap.wrap(f"{message_text} in message starting at {self._input_name}:{self._message_location}, aborting parser", width=self._log_line_len)
-            logger.critical("\n\t".join(lines))
-            if self._raw_message != self._previous_raw_message :
-                logger.info("Critical error is in message :\n\t{}".format("\n\t".join(self._raw_message.split('\n'))))
-            else :
-                logger.info("Critcal error is in message logged above")
-            self._previous_raw_message = self._raw_message
-        else :
-            if self._input_name is None :
-                lines = textwrap.wrap(message_text, width=self._log_line_len)
-            else :
-                lines = textwrap.wrap(f"{message_text} at {self._input_name}:{self._line_number}", width=self._log_line_len)
-            logger.critical("\n\t".join(lines))
+        self.log_message(logging.CRITICAL, message_text, "Critical error is in message", ", aborting parser")
         self._error_count += 1
         exit(-1)
 
+    def current_time(self, tz: Union[timezone, ZoneInfo, str]) -> "ShefParser.DateTime" :
+        '''
+        Get the current time in the specified time zone for inferring unspecified years and dates. The
+        time is re-read after a minute, or at the next (local) midnight if that is sooner, so the time
+        returned may be up to a minute old but its date is always the current date.
+        '''
+        now = time.monotonic()
+        cached = self._current_times.get(tz)
+        if cached is None or now >= cached[0] :
+            cur_time = ShefParser.DateTime.now(tz)
+            to_midnight = 86400 - (3600 * cur_time.hour + 60 * cur_time.minute + cur_time.second)
+            cached = self._current_times[tz] = now + min(60, to_midnight), cur_time
+        return cached[1]
+
     def get_parameter_code(self, partial_parameter_code: str) -> tuple[str, bool] :
         '''
         Generate a complete parameter code from a partial parameter code and defaults
         '''
+        result = self._parameter_codes.get(partial_parameter_code)
+        if result :
+            return result
         #--------------------#
         # resolve send codes #
         #--------------------#
@@ -1842,47 +1865,37 @@ class ShefParser :
         send_code = None
         if len(partial_parameter_code.strip().split()) != 1 :
             raise ShefParser.ParseException(f"Invalid parameter code: [{partial_parameter_code}]")
-        try :
-            code, value_at_prev_0700 = self._send_codes[partial_parameter_code[:2]]
+        send_info = self._send_codes.get(partial_parameter_code[:2])
+        if send_info is None :
+            code = partial_parameter_code
+        else :
+            code, value_at_prev_0700 = send_info
             if len(partial_parameter_code) != 2 and partial_parameter_code[:2] not in self._pe_conversions :
                 raise ShefParser.ParseException(f"Invalid parameter code: [{partial_parameter_code}] - {partial_parameter_code[:2]} is send code for {code}")
             if len(partial_parameter_code) == 2 :
                 send_code = partial_parameter_code[:2]
             else :
                 code = partial_parameter_code
-        except KeyError :
-            code = partial_parameter_code
         length = len(code)
         if not 2 <= length <= 7 :
             raise ShefParser.ParseException(f"Parameter code [{partial_parameter_code}] must be 2-7 characters long")
-        if length > 2 and code[2] == 'Z' and not send_code :
-            #----------------------#
-            # replace 'Z' duration #
-            #----------------------#
-            _code = code[:2]
-            try :
-                _code += ShefParser.DEFAULT_DURATION_CODES[code[:2]]
-            except KeyError :
-                _code += self._default_duration_code
-            if length > 3 :
-                _code += code[3:]
-            code = _code
-        if length > 3 and code[3] == 'Z' :
-            #------------------#
-            # replace 'Z' type #
-            #------------------#
-            _code = code[:3] + self._default_type_code
-            if length > 4 :
-                _code += code[4:]
-            code = _code
+        replace_duration = length > 2 and code[2] == 'Z' and not send_code
+        replace_type     = length > 3 and code[3] == 'Z'
+        if replace_duration or replace_type :
+            #-------------------------------#
+            # replace 'Z' duration and type #
+            #-------------------------------#
+            chars = list(code)
+            if replace_duration :
+                chars[2] = ShefParser.DEFAULT_DURATION_CODES.get(code[:2], self._default_duration_code)
+            if replace_type :
+                chars[3] = self._default_type_code
+            code = "".join(chars)
         #----------------------#
         # expand partial codes #
         #----------------------#
         if length == 2 :
-            try :
-                code += ShefParser.DEFAULT_DURATION_CODES[code]
-            except KeyError :
-                code += self._default_duration_code
+            code += ShefParser.DEFAULT_DURATION_CODES.get(code, self._default_duration_code)
             code += self._default_type_code + self._default_source_code + self._default_extremum_code + self._default_probability_code
         elif length == 3 :
             code += self._default_type_code + self._default_source_code + self._default_extremum_code + self._default_probability_code
@@ -1903,7 +1916,10 @@ class ShefParser :
             raise ShefParser.ParseException(f"Invalid extremum code [{code[5]}] in parameter_code [{code}]")
         if code [6] not in self._probability_codes :
             raise ShefParser.ParseException(f"Invalid probability code [{code[6]}] in parameter_code [{code}]")
-        return code, value_at_prev_0700
+        if len(self._parameter_codes) >= ShefParser.MAX_MEMO_SIZE :
+            self._parameter_codes.clear()
+        result = self._parameter_codes[partial_parameter_code] = code, value_at_prev_0700
+        return result
 
     def close_input(self) -> None :
         '''
@@ -1934,6 +1950,12 @@ class ShefParser :
             self._input_name = input_object
         else :
             raise ShefParser.InputException(f"Expected TextIOWrapper or str object, got [{input_object.__class__.__name__}]")
+        #---------------------------------------------------------------------#
+        # files and in-memory streams are read in batches of lines, but pipes #
+        # and terminals are read a line at a time so a message is processed  #
+        # as soon as it arrives instead of when a batch of lines has arrived #
+        #---------------------------------------------------------------------#
+        self._input_batch_size = 1000 if self._input.seekable() else 1
         self._line_number = 0
         self.debug(f"Message input set to {self._input_name}")
 
@@ -1950,6 +1972,7 @@ class ShefParser :
             if not self._output.isatty() :
                 self._output.close()
             self._output = None
+            self._write_output = None
         else :
             logger.debug("Output is already closed or was never set")
 
@@ -1966,6 +1989,11 @@ class ShefParser :
             # IO typing is wonky -- see https://github.com/python/typeshed/issues/6077
             self._output = output_object  # type: ignore
             self._output_name = output_object.name
+        if isinstance(self._output, BufferedRandom) :
+            write = self._output.write
+            self._write_output = lambda text : write(text.encode("utf-8"))
+        elif self._output :
+            self._write_output = self._output.write
         logger.debug(f"Data output set to {self._output_name}")
 
     def output(self, outrec : OutputRecord) -> None :
@@ -1977,10 +2005,7 @@ class ShefParser :
                 raise ShefParser.OutputException("Cannot output record; output is closed or never opened")
             outstr = f"{outrec.format(self._output_format)}\n"
             try:
-                if isinstance(self._output, BufferedRandom) :
-                    self._output.write(outstr.encode("utf-8"))
-                else :
-                    self._output.write(outstr)
+                self._write_output(outstr)
             except Exception as e:
                 raise ShefParser.OutputException(f"Unexpected output device type: {self._output.__class__.__name__}") from e
 
@@ -1988,31 +2013,28 @@ class ShefParser :
         '''
         Remove colon-delimited comments from a message line
         '''
-        in_comment_field = False
-        chars = []
-        for c in line :
-            if c == ':' :
-                in_comment_field = not in_comment_field
-            elif not in_comment_field :
-                chars.append(c)
-        message_line = "".join(chars)
-        return message_line
+        # each colon toggles a comment field, so the fields outside comments are the even-numbered ones
+        return "".join(line.split(':')[::2])
 
     def get_next_message(self) -> str :
         '''
         Retrieve the next complete message from the message input device
         '''
-        raw_message_lines: deque = deque()
-        message_lines: deque = deque()
+        raw_message_lines: list[str] = []
+        message_lines: list[str] = []
         message_type: str  = ''
         revised: bool = False
         in_header: bool = False
+        continue_pattern: Optional[re.Pattern] = None
         while True :
             while self._input_lines :
                 line = self._input_lines.popleft()
                 self._line_number += 1
                 self.debug(f"Removed line from input queue [{line}]")
-                message_line = self.remove_comment_fields(line).rstrip('=').rstrip('&').rstrip('=')
+                message_line = self.remove_comment_fields(line)
+                if message_line.endswith(('=', '&')) :
+                    # not the same as rstrip('=&'), which would strip all of a trailing "&=&" instead of just "=&"
+                    message_line = message_line.rstrip('=').rstrip('&').rstrip('=')
                 if not message_type :
                     #-----------------------------------#
                     # looking for first line of message #
@@ -2023,6 +2045,7 @@ class ShefParser :
                         continue
                     message_type = message_line[1]
                     revised = message_line[2] == 'R'
+                    continue_pattern = self._msg_continue_patterns.get(message_type, (None, None))[int(revised)]
                     raw_message_lines.append(line)
                     message_lines.append(message_line)
                     in_header = message_type == 'B'
@@ -2034,10 +2057,10 @@ class ShefParser :
                         raw_message_lines.append(line)
                         message_lines.append(message_line)
                         if message_line and message_line[0] == '.' :
-                            if in_header and self._msg_continue_patterns[message_type][int(revised)].search(message_line) :
+                            if in_header and continue_pattern.search(message_line) :
                                 continue
                             if not message_line.startswith(".END") :
-                                if self._msg_continue_patterns[message_type][int(revised)].search(message_line) :
+                                if continue_pattern.search(message_line) :
                                     self.error(".B message has data between header lines")
                                     message_lines.pop()
                                     message_lines.pop()
@@ -2050,8 +2073,10 @@ class ShefParser :
                                 message_lines.pop()
                                 raw_message_lines.pop()
                                 self._message_location = self._line_number-len(raw_message_lines)+1
-                                self._message = '\n'.join(list(message_lines)+[".END"])
-                                self._raw_message = '\n'.join(raw_message_lines)
+                                message_lines.append(".END")
+                                self._message = '\n'.join(message_lines)
+                                self._raw_message_lines = raw_message_lines
+                                self._raw_message = None
                                 self.error(".B message not finished before next message - missing \".END\" appended")
                                 return self._message
                             in_header = False
@@ -2060,7 +2085,7 @@ class ShefParser :
                         else :
                             in_header = False
                     else :
-                        if self._msg_continue_patterns[message_type][int(revised)].search(message_line) :
+                        if continue_pattern.search(message_line) :
                             raw_message_lines.append(line)
                             message_lines.append(message_line)
                         else :
@@ -2078,7 +2103,8 @@ class ShefParser :
                 if message_type == 'B' :
                     self._message_location = self._line_number-len(raw_message_lines)+1
                     self._message = '\n'.join(message_lines)
-                    self._raw_message = '\n'.join(raw_message_lines)
+                    self._raw_message_lines = raw_message_lines
+                    self._raw_message = None
                     self.error(".B message not finished before input exhaused - missing \".END\" appended")
                     message_lines.append(".END")
                 break
@@ -2086,31 +2112,26 @@ class ShefParser :
                 #----------------#
                 # read more data #
                 #----------------#
-                for i in range(100) :
-                    try :
-                        line = self._input.readline()
-                    except Exception as e:
-                        self.error(f"Line read error: {exc_info(e)}")
-                        continue
-                    if line :
-                        if line[-1] == '\n' :
-                            self._input_lines.append(line[:-1])
-                        else :
-                            self._input_lines.append(line)
-                            self.close_input()
-                            break
-                    else :
-                        self.close_input()
-                        break
+                queued = len(self._input_lines)
+                try :
+                    # the lines read before any error are kept in the queue
+                    self._input_lines.extend(line.rstrip('\n') for line in islice(self._input, self._input_batch_size))
+                except Exception as e:
+                    self.error(f"Line read error: {exc_info(e)}")
+                    continue
+                if len(self._input_lines) - queued < self._input_batch_size :
+                    # a short batch means the end of the input was reached
+                    self.close_input()
                 self.debug(f"Put {len(self._input_lines)} lines from {self._input_name} into input queue")
         self._message_location = self._line_number-len(raw_message_lines)+1
-        self._raw_message = '\n'.join(raw_message_lines)
+        self._raw_message_lines = raw_message_lines
+        self._raw_message = None
         self._message = '\n'.join(message_lines)
-        if self._message :
+        if self._message and logger.isEnabledFor(logging.DEBUG) :
             self.debug("Assembled message starting at {0}:{1}:\n\t{2}".format(
                 self._input_name,
                 self._message_location,
-                "\n\t".join(self._raw_message.split('\n'))))
+                "\n\t".join(raw_message_lines)))
         return self._message
 
     def parse_header_date(self, datestr : str, time_zone: Union[timezone, ZoneInfo, str], shefit_times: bool = False) -> tuple:
@@ -2123,8 +2144,16 @@ class ShefParser :
             shefit_times = whether the parser is using shefit-style times
         '''
         century_specified = False
-        dt = ShefParser.DateTime.now(time_zone)
+        dt = self.current_time(time_zone)
         cy, cm, cd = dt.year, dt.month, dt.day
+        #------------------------------------------------------------------#
+        # the result only depends on the arguments and the current date,   #
+        # so a memoized result is only used on the date it was computed    #
+        #------------------------------------------------------------------#
+        key = (datestr, time_zone, shefit_times)
+        cached = self._header_dates.get(key)
+        if cached is not None and cached[0] == (cy, cm, cd) :
+            return cached[1]
         length = len(datestr)
         cur_date = ShefParser.DateTime(cy, cm, cd, 0, 0, 0, tzinfo=time_zone)
         if length == 4 : # mmdd
@@ -2138,7 +2167,7 @@ class ShefParser :
             y, m, d = int(datestr[0:4]), int(datestr[4:6]), int(datestr[6:8])
         else :
             raise ShefParser.ParseException(f"Bad date string: [{datestr}]")
-        if not 1700 <= y <= 2100 or not 1 <= m <= 12 or not 1 <= d <= ShefParser.DateTime.last_day(y, m) :
+        if not 1700 <= y <= 2100 or not 1 <= m <= 12 or not 1 <= d <= ShefParser.DateTime.DAYS_IN_MONTH[(y, m)] :
             raise ShefParser.ParseException(f"Bad date string: [{datestr}]")
         try :
             if length == 4 :
@@ -2152,18 +2181,34 @@ class ShefParser :
                     elif month_diff ==  6 and cd > d : y += 1
                     dateval = ShefParser.DateTime(y, m, d, 0, 0, 0, tzinfo=time_zone)
                 else :
-                    dateval = ShefParser.DateTime(y, m, d, 0, 0, 0, tzinfo=time_zone)
-                    prev_year = dateval - MonthsDelta(12)
-                    cur_diff = (dateval - cur_date)
-                    prev_diff = (cur_date - prev_year)
-                    if not isinstance(cur_diff, timedelta) or not isinstance(prev_diff, timedelta) :
-                        raise ShefParser.ParseException(f"Invalid comparison types: {prev_diff.__class__.__name__}, {cur_diff.__class__.__name__}")
-                    if prev_diff < cur_diff :
-                        if not isinstance(prev_year, ShefParser.DateTime) :
-                            raise ShefParser.ParseException(f"Expected ShefParser.DateTime object, got {prev_year.__class__.__name__}")
-                        dateval = prev_year
+                    #------------------------------------------------------------------#
+                    # use the current year unless the same date in the previous year   #
+                    # is closer to the current date. Compare whole days first, since   #
+                    # UTC offsets can only change the outcome when the day counts are  #
+                    # within one of each other                                         #
+                    #------------------------------------------------------------------#
+                    cur_ordinal = date(cy, cm, cd).toordinal()
+                    py, pd      = y - 1, min(d, ShefParser.DateTime.last_day(y - 1, m))
+                    cur_days    = date(y, m, d).toordinal() - cur_ordinal
+                    prev_days   = cur_ordinal - date(py, m, pd).toordinal()
+                    if abs(prev_days - cur_days) > 1 :
+                        if prev_days < cur_days :
+                            y, d = py, pd
+                        dateval = ShefParser.DateTime(y, m, d, 0, 0, 0, tzinfo=time_zone)
+                    else :
+                        dateval = ShefParser.DateTime(y, m, d, 0, 0, 0, tzinfo=time_zone)
+                        prev_year = dateval - MonthsDelta.cached(12)
+                        cur_diff = (dateval - cur_date)
+                        prev_diff = (cur_date - prev_year)
+                        # DateTime - MonthsDelta is a DateTime and DateTime - DateTime is a timedelta
+                        assert isinstance(prev_year, ShefParser.DateTime) and isinstance(cur_diff, timedelta) and isinstance(prev_diff, timedelta)
+                        if prev_diff < cur_diff :
+                            dateval = prev_year
             else :
                 dateval = ShefParser.DateTime(y, m, d, 0, 0, 0, tzinfo=time_zone)
+            if len(self._header_dates) >= ShefParser.MAX_MEMO_SIZE :
+                self._header_dates.clear()
+            self._header_dates[key] = (cy, cm, cd), (dateval, century_specified)
             return dateval, century_specified
         except :
             raise ShefParser.ParseException(f"Bad date string: [{datestr}]")
@@ -2183,40 +2228,49 @@ class ShefParser :
         #------------------------------------------------------------------------------------------#
         # change any '/' characters in observation time(s) to '@' to prevent tokenization problems #
         #------------------------------------------------------------------------------------------#
-        while self._multiple_obs_time_pattern.search(datastr) :
-            datastr = self._multiple_obs_time_pattern.sub(r"\1@\6\7", datastr)
+        datastr = self._multiple_obs_time_pattern.sub(r"\1@", datastr)
         #------------------------#
         # parse individual lines #
         #------------------------#
-        lines = datastr.strip().split('\n')
-        prev = 0
-        for i in range(len(lines)) :
+        continue_sub         = self._msg_continue_patterns[message_type][int(is_revised)].sub
+        retained_comment_sub = self._retained_comment_pattern.sub
+        lines: list[str] = []
+        has_comments = False
+        for line in datastr.strip().split('\n') :
             #----------------------------------------------------------------------------#
             # remove continuation headers and handle implicit '/' across line boundaries #
             #----------------------------------------------------------------------------#
-            lines[i] = self._msg_continue_patterns[message_type][int(is_revised)].sub("", lines[i]).strip()
-            if not lines[i] :
+            line = continue_sub("", line).strip()
+            if not line :
+                continue
+            if lines and lines[-1][-1] != '/' and line[0] != '/' :
+                line = '/' + line
+            if '"' not in line and "'" not in line :
+                # no retained comments, so just collapse the whitespace to NUL and normalize the case
+                lines.append('\x00'.join(line.upper().split()))
                 continue
-            if i > 0 :
-                if lines[prev][-1] != '/' and lines[i][0] != '/' :
-                    lines[i] = '/' + lines[i]
-            prev = i
+            has_comments = True
             # make sure retained comments are separated from values
-            lines[i] = self._retained_comment_pattern.sub(r" \1", lines[i])
+            line = retained_comment_sub(r" \1", line)
             # set all the whitespace in retained comments to non-whitespace
-            lines[i] = ShefParser.hide_quoted_whitespace(lines[i])
-            # collapse whitespace
-            lines[i] = ' '.join(lines[i].split())
-            # invert the whitespace/non-whitespace replacements in the entire line (swap ' ' with NUL, and '\t' with SOH)
-            lines[i] = lines[i].translate({0:32,1:9,32:0,9:1})
+            line = ShefParser.hide_quoted_whitespace(line)
+            if '\x00' in line or '\x01' in line :
+                # collapse whitespace, then invert the whitespace/non-whitespace replacements in the entire line
+                # (swap ' ' with NUL, and '\t' with SOH)
+                lines.append(' '.join(line.split()).translate(ShefParser.SWAP_WHITESPACE))
+            else :
+                # nothing to swap back, so just collapse the whitespace to NUL
+                lines.append('\x00'.join(line.split()))
         #------------------------------------------------------#
         # convert lines back into a single string and tokenize #
         #------------------------------------------------------#
         datastr = "".join(lines).strip('/')
-        tokens: list[Any] = datastr.split('/')
-        for i in range(len(tokens)) :
-            # split the tokens on whitespace replacements (NUL,SOH) after stripping replacements
-            tokens[i] = self._replacement_split_pattern.split(self._replacement_strip_pattern.sub("", tokens[i]))
+        strip_replacements, split_replacements = self._replacement_strip_pattern.sub, self._replacement_split_pattern.split
+        # split the tokens on whitespace replacements (NUL,SOH) after stripping replacements
+        tokens: list[Any] = [split_replacements(strip_replacements("", token)) for token in datastr.split('/')]
+        if has_comments :
+            # normalize the case of everything but the retained comments
+            tokens = [[item if item[:1] in "'\"" else item.upper() for item in token_group] for token_group in tokens]
         return tokens
 
     def get_observation_time(self, base_time: DateTime, token: str, century_specified: bool, dot_b: bool=False) -> tuple :
@@ -2242,118 +2296,80 @@ class ShefParser :
         subtokens = token.strip('@').split('@')
         if len(subtokens) > 1 and subtokens[0][1] == 'J' :
             raise ShefParser.ParseException(f"Bad observation time: [{subtokens[0]}]/[{subtokens[1]}]")
+        cur_time: Union[None, ShefParser.DateTime] = None
         for subtoken in subtokens :
             try :
-                cur_time = ShefParser.DateTime.now('Z' if self.shefit_times else ShefParser.UTC)
+                code = subtoken[1]
+                if code in "YJ" and cur_time is None :
+                    cur_time = self.current_time(self._utc_tz_marker)
                 v = subtoken[2:]
                 length = len(v)
-                if subtoken[1] == 'S' :
-                    if length == 2 : # DSss
-                        obstime = ShefParser.DateTime(bt.year, bt.month, bt.day, bt.hour, bt.minute, int(v[0:2]), tzinfo=bt.tzinfo)
-                    else :
-                        raise ShefParser.ParseException(f"Bad observation time: [{subtoken}]")
-                elif subtoken[1] == 'N' :
-                    if length == 4 : # DNnnss
-                        obstime = ShefParser.DateTime(bt.year, bt.month, bt.day, bt.hour, int(v[0:2]), int(v[2:4]), tzinfo=bt.tzinfo)
-                    elif length == 2 : # DNnn
-                        obstime = ShefParser.DateTime(bt.year, bt.month, bt.day, bt.hour, int(v[0:2]), bt.second, tzinfo=bt.tzinfo)
-                    else :
+                fields = ShefParser.OBS_TIME_FIELDS.get((code, length))
+                if fields is not None :
+                    #-------------------------------------------------------#
+                    # absolute date/time: replace the specified fields of   #
+                    # the base time (DT also zeros unspecified min and sec) #
+                    #-------------------------------------------------------#
+                    if not ShefParser._signed_integer_pattern.fullmatch(v) :
                         raise ShefParser.ParseException(f"Bad observation time: [{subtoken}]")
-                elif subtoken[1] == 'H' :
-                    if length == 6 : # DHhhnnss
-                        obstime = ShefParser.DateTime(bt.year, bt.month, bt.day, int(v[0:2]), int(v[2:4]), int(v[4:6]), tzinfo=bt.tzinfo)
-                    elif length == 4 : # DHhhnn
-                        obstime = ShefParser.DateTime(bt.year, bt.month, bt.day, int(v[0:2]), int(v[2:4]), bt.second, tzinfo=bt.tzinfo)
-                    elif length == 2 : # DHhh
-                        obstime = ShefParser.DateTime(bt.year, bt.month, bt.day, int(v[0:2]), bt.minute, bt.second, tzinfo=bt.tzinfo)
+                    if code == 'T' :
+                        values = [bt.year, bt.month, bt.day, bt.hour, 0, 0]
                     else :
-                        raise ShefParser.ParseException(f"Bad observation time: [{subtoken}]")
-                elif subtoken[1] == 'D' :
-                    if length == 8 : # DDddhhnnss
-                        obstime = ShefParser.DateTime(bt.year, bt.month, int(v[0:2]), int(v[2:4]), int(v[4:6]), int(v[6:8]), tzinfo=bt.tzinfo)
-                    elif length == 6 : # DDddhhnn
-                        obstime = ShefParser.DateTime(bt.year, bt.month, int(v[0:2]), int(v[2:4]), int(v[4:6]), bt.second, tzinfo=bt.tzinfo)
-                    elif length == 4 : # DDddhh
-                        obstime = ShefParser.DateTime(bt.year, bt.month, int(v[0:2]), int(v[2:4]), bt.hour, bt.second, tzinfo=bt.tzinfo)
-                    elif length == 2 : # DDdd
-                        obstime = ShefParser.DateTime(bt.year, bt.month, int(v[0:2]), bt.hour, bt.minute, bt.second, tzinfo=bt.tzinfo)
-                    else :
-                        raise ShefParser.ParseException(f"Bad observation time: [{subtoken}]")
-                elif subtoken[1] == 'M' :
-                    if length == 10 : # DMmmddhhnnss
-                        obstime = ShefParser.DateTime(bt.year, int(v[0:2]), int(v[2:4]), int(v[4:6]), int(v[6:8]), int(v[8:10]), tzinfo=bt.tzinfo)
-                    elif length == 8 : # DMmmddhhnn
-                        obstime = ShefParser.DateTime(bt.year, int(v[0:2]), int(v[2:4]), int(v[4:6]), int(v[6:8]), bt.second, tzinfo=bt.tzinfo)
-                    elif length == 6 : # DMmmddhh
-                        obstime = ShefParser.DateTime(bt.year, int(v[0:2]), int(v[2:4]), int(v[4:6]), bt.minute, bt.second, tzinfo=bt.tzinfo)
-                    elif length == 4 : # DMmmdd
-                        obstime = ShefParser.DateTime(bt.year, int(v[0:2]), int(v[2:4]), bt.hour, bt.minute, bt.second, tzinfo=bt.tzinfo)
-                    elif length == 2 : # DMmm
-                        obstime = ShefParser.DateTime(bt.year, int(v[0:2]), bt.day, bt.hour, bt.minute, bt.second, tzinfo=bt.tzinfo)
-                    else :
-                        raise ShefParser.ParseException(f"Bad observation time: [{subtoken}]")
-                elif subtoken[1] == 'Y' :
-                    if length > 1 :
+                        values = [bt.year, bt.month, bt.day, bt.hour, bt.minute, bt.second]
+                    #-------------------------------------------------------#
+                    # peel the fields off the right end of the value, which #
+                    # leaves the DYyy or DTcc digits (or zero) in n. A sign #
+                    # is part of the first field, so DH+1 is hour 1 and     #
+                    # DD-112 is day -1 (an invalid date), hour 12           #
+                    #-------------------------------------------------------#
+                    n = int(v.lstrip("+-"))
+                    for i, start, end in reversed(fields) :
+                        n, values[i] = divmod(n, 10 ** (end - start))
+                    if v[0] == '-' :
+                        if fields and fields[0][1] == 0 :
+                            values[fields[0][0]] = -values[fields[0][0]]
+                        else :
+                            n = -n
+                    if code == 'T' :
+                        if length == 2 : # DTcc
+                            values[0] = 100*n+bt.year%100
+                    elif code == 'Y' :
                         if century_specified :
-                            y = bt.year - bt.year % 100 + int(v[0:2])
+                            y = bt.year - bt.year % 100 + n
                         else :
-                            y = cur_time.year - cur_time.year % 100 + int(v[0:2])
+                            y = cur_time.year - cur_time.year % 100 + n
                         if y - cur_time.year > 10 : y -= 100
-                    else :
-                        raise ShefParser.ParseException(f"Bad observation time: [{subtoken}]")
-                    if length == 12 : # DYyymmddhhnnss
-                        obstime = ShefParser.DateTime(y, int(v[2:4]), int(v[4:6]), int(v[6:8]), int(v[8:10]), int(v[10:12]), tzinfo=bt.tzinfo)
-                    elif length == 10 : # DYyymmddhhnn - set date and time
-                        obstime = ShefParser.DateTime(y, int(v[2:4]), int(v[4:6]), int(v[6:8]), int(v[8:10]), bt.second, tzinfo=bt.tzinfo)
-                    elif length == 8 : # DYyymmddhh
-                        obstime = ShefParser.DateTime(y, int(v[2:4]), int(v[4:6]), int(v[6:8]), bt.minute, bt.second, tzinfo=bt.tzinfo)
-                    elif length == 6 : # DYyymmdd
-                        obstime = ShefParser.DateTime(y, int(v[2:4]), int(v[4:6]), bt.hour, bt.minute, bt.second, tzinfo=bt.tzinfo)
-                    elif length == 4 : # DYyymm
-                        obstime = ShefParser.DateTime(y, int(v[2:4]), bt.day, bt.hour, bt.minute, bt.second, tzinfo=bt.tzinfo)
-                    elif length == 2 : # DYyy
-                        obstime = ShefParser.DateTime(y, bt.month, bt.day, bt.hour, bt.minute, bt.second, tzinfo=bt.tzinfo)
-                    else :
-                        raise ShefParser.ParseException(f"Bad observation time: [{subtoken}]")
-                elif subtoken[1] == 'T' :
-                    if length == 14 : #DTccyymmddhhnnss
-                        obstime = ShefParser.DateTime(int(v[0:4]), int(v[4:6]), int(v[6:8]), int(v[8:10]), int(v[10:12]), int(v[12:14]), tzinfo=bt.tzinfo)
-                    elif length == 12 : #DTccyymmddhhnn
-                        obstime = ShefParser.DateTime(int(v[0:4]), int(v[4:6]), int(v[6:8]), int(v[8:10]), int(v[10:12]), 0, tzinfo=bt.tzinfo)
-                    elif length == 10 : #DTccyymmddhh
-                        obstime = ShefParser.DateTime(int(v[0:4]), int(v[4:6]), int(v[6:8]), int(v[8:10]), 0, 0, tzinfo=bt.tzinfo)
-                    elif length == 8 : #DTccyymmdd
-                        obstime = ShefParser.DateTime(int(v[0:4]), int(v[4:6]), int(v[6:8]), bt.hour, 0, 0, tzinfo=bt.tzinfo)
-                    elif length == 6 : #DTccyymm
-                        obstime = ShefParser.DateTime(int(v[0:4]), int(v[4:6]), bt.day, bt.hour, 0, 0, tzinfo=bt.tzinfo)
-                    elif length == 4 : #DTccyy
-                        obstime = ShefParser.DateTime(int(v[0:4]), bt.month, bt.day, bt.hour, 0, 0, tzinfo=bt.tzinfo)
-                    elif length == 2 : #DTcc
-                        obstime = ShefParser.DateTime(100*int(v[0:2])+bt.year%100, bt.month, bt.day, bt.hour, 0, 0, tzinfo=bt.tzinfo)
-                    else :
+                        values[0] = y
+                    obstime = ShefParser.DateTime.cached(*values, bt.tzinfo)
+                elif code in "SNHDMYT" :
+                    raise ShefParser.ParseException(f"Bad observation time: [{subtoken}]")
+                elif code == 'J' :
+                    if not ShefParser._signed_integer_pattern.fullmatch(v) :
                         raise ShefParser.ParseException(f"Bad observation time: [{subtoken}]")
-                elif subtoken[1] == 'J' :
                     if length == 7 : # DJccyyddd
                         y = int(v[0:4])
                         d = int(v[4:])
-                        if d > (366 if ShefParser.DateTime.is_leap(y) else 365) :
+                        if d > 365 and (d > 366 or not ShefParser.DateTime.is_leap(y)) :
                             raise ShefParser.ParseException(f"Invalid day: [{subtoken}]")
-                        obstime = ShefParser.DateTime(y, 1, 1, bt.hour, bt.minute, bt.second, tzinfo=bt.tzinfo) + timedelta(days=int(v[4:7])-1)
+                        jd = date.fromordinal(date(y, 1, 1).toordinal() + d - 1)
+                        obstime = ShefParser.DateTime(jd.year, jd.month, jd.day, bt.hour, bt.minute, bt.second, tzinfo=bt.tzinfo)
                     elif length == 5 : # DJyyddd
                         y = cur_time.year - cur_time.year % 100 + int(v[0:2])
                         if y - cur_time.year > 10 : y -= 100
                         d = int(v[2:])
-                        if d > (366 if ShefParser.DateTime.is_leap(y) else 365) :
+                        if d > 365 and (d > 366 or not ShefParser.DateTime.is_leap(y)) :
                             raise ShefParser.ParseException(f"Invalid day: [{subtoken}]")
-                        obstime = ShefParser.DateTime(y, 1, 1, bt.hour, bt.minute, bt.second, tzinfo=bt.tzinfo) + timedelta(days=int(v[2:5])-1)
+                        jd = date.fromordinal(date(y, 1, 1).toordinal() + d - 1)
+                        obstime = ShefParser.DateTime(jd.year, jd.month, jd.day, bt.hour, bt.minute, bt.second, tzinfo=bt.tzinfo)
                     elif length < 4 : # DJd[d[d]]
                         d = int(v)
-                        if d > (366 if ShefParser.DateTime.is_leap(bt.year) else 365) :
+                        if d > 365 and (d > 366 or not ShefParser.DateTime.is_leap(bt.year)) :
                             raise ShefParser.ParseException(f"Invalid day: [{subtoken}]")
-                        obstime = ShefParser.DateTime(bt.year, 1, 1, bt.hour, bt.minute, bt.second, tzinfo=bt.tzinfo) + timedelta(days=int(v[0:])-1)
+                        jd = date.fromordinal(date(bt.year, 1, 1).toordinal() + d - 1)
+                        obstime = ShefParser.DateTime(jd.year, jd.month, jd.day, bt.hour, bt.minute, bt.second, tzinfo=bt.tzinfo)
                     else :
                         raise ShefParser.ParseException(f"Bad observation time: [{subtoken}]")
-                elif subtoken[1] == 'R' :
+                elif code == 'R' :
                     # for .B messages the relative times are kept in the parameter info objects
                     obstime = None
                     v = subtoken[3:]
@@ -2382,24 +2398,22 @@ class ShefParser :
                             obstime = bt + timedelta(days=val)
                     elif subtoken[2] == 'M' :
                         if dot_b :
-                            relativetime = MonthsDelta(val)
+                            relativetime = MonthsDelta.cached(val)
                         else :
-                            obstime = bt + MonthsDelta(val)
+                            obstime = bt + MonthsDelta.cached(val)
                     elif subtoken[2] == 'E' :
                         if dot_b :
-                            relativetime = MonthsDelta(val, eom=True)
+                            relativetime = MonthsDelta.cached(val, eom=True)
                         else :
-                            obstime = bt + MonthsDelta(val, eom=True)
+                            obstime = bt + MonthsDelta.cached(val, eom=True)
                     elif subtoken[2] == 'Y' :
                         if dot_b :
-                            relativetime = MonthsDelta(12*val)
+                            relativetime = MonthsDelta.cached(12*val)
                         else :
-                            obstime = bt + MonthsDelta(12*val)
+                            obstime = bt + MonthsDelta.cached(12*val)
                     else :
                         raise ShefParser.ParseException(f"Bad observation time: [{subtoken}]")
-            except ShefParser.Exc :
-                raise
-            except :
+            except (ValueError, TypeError, IndexError, OverflowError) :
                 raise ShefParser.ParseException(f"Bad observation time: [{subtoken}]")
         return obstime, relativetime, century_specified
 
@@ -2409,135 +2423,97 @@ class ShefParser :
         '''
         if not token:
             return None
-        curtime = ShefParser.DateTime.now('Z' if self.shefit_times else ShefParser.UTC)
-        threshold = ShefParser.DateTime(obstime.year, obstime.month, obstime.day, 0, 0, 0, tzinfo=obstime.tzinfo) + MonthsDelta(120)
         s = token
         length = len(s)
         try :
-            if length == 12 :   # ccyymmddhhnn
-                y, m, d, h, n = int(s[0:4]), int(s[4:6]), int(s[6:8]), int(s[8:10]), int(s[10:12])
-                dt = ShefParser.DateTime(y, m, d, h, n, 0, tzinfo=obstime.tzinfo)
-            elif length == 10 : # yymmddhhnn
-                y = curtime.year - curtime.year % 100 + int(s[0:2])
-                m, d, h, n = int(s[2:4]), int(s[4:6]), int(s[6:8]), int(s[8:10])
-                dt = ShefParser.DateTime(y, m, d, h, n, 0, tzinfo=obstime.tzinfo)
-                while dt > threshold :
-                    dt2 = dt - MonthsDelta(1200)
-                    if not isinstance(dt2, ShefParser.DateTime) :
-                        raise ShefParser.ParseException(f"Expected ShefParser.DateTime object, got {dt2.__class__.__name__}")
-                    dt = dt2
-            elif length == 8 :  # mmddhhnn
-                y, m, d, h, n = obstime.year, int(s[0:2]), int(s[2:4]), int(s[4:6]), int(s[6:8])
-                dt = ShefParser.DateTime(y, m, d, h, n, 0, tzinfo=obstime.tzinfo)
-                while dt > threshold :
-                    dt2 = dt - MonthsDelta(1200)
-                    if not isinstance(dt2, ShefParser.DateTime) :
-                        raise ShefParser.ParseException(f"Expected ShefParser.DateTime object, got {dt2.__class__.__name__}")
-                    dt = dt2
-            elif length == 6 :  # mmddhh
-                y, m, d, h, n = obstime.year, int(s[0:2]), int(s[2:4]), int(s[4:6]), 0
-                dt = ShefParser.DateTime(y, m, d, h, n, 0, tzinfo=obstime.tzinfo)
-                while dt > threshold :
-                    dt2 = dt - MonthsDelta(1200)
-                    if not isinstance(dt2, ShefParser.DateTime) :
-                        raise ShefParser.ParseException(f"Expected ShefParser.DateTime object, got {dt2.__class__.__name__}")
-                    dt = dt2
-            elif length == 4 :  # mmdd
-                hour = 12 if obstime.tzinfo in ('Z', ShefParser.UTC) else 24
-                y, m, d, h, n = obstime.year, int(s[0:2]), int(s[2:4]), hour, 0
-                dt = ShefParser.DateTime(y, m, d, h, n, 0, tzinfo=obstime.tzinfo)
-                while dt > threshold :
-                    dt2 = dt - MonthsDelta(1200)
-                    if not isinstance(dt2, ShefParser.DateTime) :
-                        raise ShefParser.ParseException(f"Expected ShefParser.DateTime object, got {dt2.__class__.__name__}")
-                    dt = dt2
-            else :
+            fields = ShefParser.CREATE_TIME_FIELDS.get(length)
+            if fields is None or not s.isdigit() :
                 raise ShefParser.ParseException(f"Bad creation time: [{token}]")
+            #-------------------------------------------------------#
+            # mmdd creation times are at 1200 for Z and UTC and at  #
+            # 2400 otherwise, other unspecified fields are zero     #
+            #-------------------------------------------------------#
+            values = [obstime.year, 0, 0, 0, 0, 0]
+            if length == 4 :
+                values[3] = 12 if obstime.tzinfo in ('Z', ShefParser.UTC) else 24
+            for i, start, end in fields :
+                values[i] = int(s[start:end])
+            if length == 10 :
+                curtime = self.current_time(self._utc_tz_marker)
+                values[0] += curtime.year - curtime.year % 100
+            dt = ShefParser.DateTime(*values, tzinfo=obstime.tzinfo)
+            if length != 12 :
+                #------------------------------------------------------------#
+                # no century specified, so keep within 10 years after the    #
+                # observation date                                           #
+                #------------------------------------------------------------#
+                threshold = ShefParser.DateTime(obstime.year, obstime.month, obstime.day, 0, 0, 0, tzinfo=obstime.tzinfo) + MonthsDelta.cached(120)
+                if dt > threshold :
+                    # move back by the whole centuries in the year difference, plus one if still after the threshold
+                    dt2 = dt - MonthsDelta.cached(1200 * max((dt.year - threshold.year) // 100, 1))
+                    assert isinstance(dt2, ShefParser.DateTime)
+                    if dt2 > threshold :
+                        dt2 = dt2 - MonthsDelta.cached(1200)
+                        assert isinstance(dt2, ShefParser.DateTime)
+                    dt = dt2
             return dt
-        except :
+        except (ValueError, TypeError, OverflowError, ShefParser.DateTimeException) :
             raise ShefParser.ParseException(f"Bad creation time: [{token}]")
 
     def parse_value_token_alt(self, token: str) -> tuple :
         '''
         Returns the numeric value and data qualifier from a token that the regex fails to match
         '''
-        value = qualifier = None
-        has_digit = has_decimal = has_qualifier = error = False
-        for i in range(len(token)) :
-            if token[i].isdigit() :
-                has_digit = True
-            elif token[i] in "-+" :
-                if i != 0 :
-                    error = True
-                    break
-            elif token[i] == '.' :
-                if has_decimal :
-                    error = True
-                    break
-                has_decimal = True
-            elif token[i].isalpha() :
-                if has_qualifier :
-                    error = True
-                    break
-                if has_digit :
-                    value = float(token[:i])
-                    qualifier = token[i]
-                    if i < len(token)-1 :
-                        if not token[i+1].isspace() and token[i+1] not in "'\"" :
-                            error = True
-                    break
-                else :
-                    error = True
-                    break
-            else :
-                error = True
-                break
-        if error :
-            if self._replacement_split_pattern.sub("", token).strip() :
-                raise ShefParser.ParseException(f"Invalid value: [{token}]")
-            else :
-                raise ShefParser.ParseException("Missing value")
-        return value, qualifier
+        m = self._alt_value_pattern.match(token)
+        if m :
+            if m.group(2) is None :
+                return None, None
+            return float(m.group(1)), m.group(2)
+        if self._replacement_split_pattern.sub("", token).strip() :
+            raise ShefParser.ParseException(f"Invalid value: [{token}]")
+        else :
+            raise ShefParser.ParseException("Missing value")
 
     def parse_value_token(self, token: str, pe_code: str, units: str) -> tuple :
         '''
         Returns the numeric value and data qualifier for a specified physical element and units system from a token
         '''
-        m = self._value_pattern.match(self._retained_comment_pattern.sub("", token).strip())
+        if '"' in token or "'" in token :
+            m = self._value_pattern.match(self._retained_comment_pattern.sub("", token).strip())
+        else :
+            # no retained comment to remove
+            m = self._value_pattern.match(token.strip())
         if not m :
             return self.parse_value_token_alt(token)
-        # groups
-        # 1 = value
-        # 2 = numeric value
-        # 3 = trace value
-        # 4 = missing valule
-        # 5 = value qualifier
-        matched_groups = "".join(map(lambda x : 'T' if bool(x) else 'F', [m.group(i) for i in (2,3,4)]))
+        # groups: value, numeric value, trace value, missing value, value qualifier
+        _, numeric_value, trace_value, missing_value, value_qualifier = m.groups()
+        # bit flags of the matched groups: 1 = numeric, 2 = trace, 4 = missing
+        matched_groups = (1 if numeric_value else 0) | (2 if trace_value else 0) | (4 if missing_value else 0)
         qualifier = None
-        if matched_groups == "TFF" :
+        if matched_groups == 1 :
             #------------------------------#
             # value (with or without sign) #
             #------------------------------#
-            value = float(m.group(2))
-            if units == "EN" and pe_code in ("PC", "PP") and '.' not in m.group(2) :
+            value = float(numeric_value)
+            if units == "EN" and pe_code in ("PC", "PP") and '.' not in numeric_value :
                 value /= 100
             elif units == "SI" and value != -9999. :
                 value = self.get_english_unit_value(value, pe_code)
             if value == 0 : value = 0 # prevent -0.000
-        elif matched_groups ==  "FTF" :
+        elif matched_groups == 2 :
             #---------------------------#
             # Precipitation trace value #
             #---------------------------#
             if pe_code not in ("PC", "PP") :
-                raise ShefParser.ParseException(f"Value [{m.group(3)}] is not valid for pe_code [{pe_code}]")
+                raise ShefParser.ParseException(f"Value [{trace_value}] is not valid for pe_code [{pe_code}]")
             value = .001
-        elif matched_groups == "FFT" :
+        elif matched_groups == 4 :
             #-----------------------#
             # explicit missing data #
             #-----------------------#
             value = -9999.
-            v = m.group(4).upper()
-            if len(v) > 1 and v[-1].isalpha() and not m.group(5) :
+            v = missing_value.upper()
+            if len(v) > 1 and v[-1].isalpha() and not value_qualifier :
                 qualifier = v[-1]
         else :
             #---------------------------------------#
@@ -2545,7 +2521,7 @@ class ShefParser :
             #---------------------------------------#
             raise ShefParser.ParseException(f"Invalid data value: [{token}]")
         if not qualifier :
-            qualifier = m.group(5).upper()
+            qualifier = value_qualifier.upper()
         return value, qualifier
 
     def get_time_zone(self, name: str) -> Union[str, timezone, ZoneInfo] :
@@ -2554,15 +2530,18 @@ class ShefParser :
         '''
         if self.shefit_times :
             return name
-        else :
+        tz = self._time_zones.get(name)
+        if tz is None :
             text = ShefParser.TZ_NAMES[name]
             try :
                 if text.startswith("timedelta") :
-                    return timezone(eval(text))
+                    tz = timezone(eval(text))
                 else :
-                    return ZoneInfo(text)
+                    tz = ZoneInfo(text)
             except :
                 raise ShefParser.ParseException(f"Cannot instantiate time zone [{name}]")
+            self._time_zones[name] = tz
+        return tz
 
     def get_english_unit_value(self, value: float, parameter: str) -> float :
         '''
@@ -2570,15 +2549,11 @@ class ShefParser :
         '''
         key = parameter[:2].upper()
         try :
-            factor = self._pe_conversions[key]
+            # C to F is (1.8, 32), all others are (factor, 0)
+            scale, offset = self._pe_unit_conversions[key]
         except KeyError :
             raise ShefParser.ParseException(f"Cannot find conversion factor for phyical element [{key}]")
-        if factor == -1 :
-            # C to F conversion
-            value = value * 1.8 + 32
-        else :
-            value *= factor
-        return value
+        return value * scale + offset
 
     def parse_message(self) -> list :
         '''
@@ -2593,43 +2568,45 @@ class ShefParser :
                 return self.parse_dot_e_message(self._message)
         return []
 
-    def parse_dot_a_message(self, message: str) -> list :
+    def retokenize_dot_a_data(self, tokens: list) -> list :
         '''
-        Parse a .A or .AR message and return a list of OutputRecord objects
+        Accomodates sloppy slash usage in .A message like shefit
         '''
-        def retokenize(tokens: list) -> list :
-            '''
-            Accomodates sloppy slash usage in .A message like shefit
-            '''
-            new_tokens = []
-            skip = False
-            for i in range(len(tokens)) :
-                if skip :
-                    skip = False
-                    continue
-                if len(tokens[i]) == 1 :
-                    if self._parameter_code_pattern.match(tokens[i][0]) and tokens[i][0][0] != 'D':
-                        if i < len(tokens)-1 :
-                            if self._parameter_code_pattern.match(tokens[i+1][0]) and tokens[i+1][0][0] != 'D':
-                                new_tokens.append(tokens[i] + [chr(0)])
-                            else :
-                                new_tokens.append(tokens[i] + tokens[i+1])
-                                skip = True
+        parameter_code_match = self._parameter_code_pattern.match
+        obs_time_match       = self._obs_time_pattern2.match
+        unit_system_match    = self._unit_system_pattern.match
+        new_tokens = []
+        skip = False
+        # pair each token group with the following one (None for the last)
+        for token_group, next_group in zip(tokens, tokens[1:] + [None]) :
+            if skip :
+                skip = False
+                continue
+            if len(token_group) == 1 :
+                if parameter_code_match(token_group[0]) and token_group[0][0] != 'D':
+                    if next_group is not None :
+                        if parameter_code_match(next_group[0]) and next_group[0][0] != 'D':
+                            new_tokens.append(token_group + ['\x00'])
                         else :
-                            new_tokens.append(tokens[i])
+                            new_tokens.append(token_group + next_group)
+                            skip = True
                     else :
-                        new_tokens.append(tokens[i])
+                        new_tokens.append(token_group)
                 else :
-                    count = 0
-                    for j in range(len(tokens[i])) :
-                        if self._obs_time_pattern2.match(tokens[i][j]) or self._unit_system_pattern.match(tokens[i][j]) :
-                            new_tokens.append([tokens[i][j]])
-                            count += 1
-                        else :
-                            new_tokens.append(tokens[i][count:])
-                            break
-            return new_tokens
+                    new_tokens.append(token_group)
+            else :
+                for count, token in enumerate(token_group) :
+                    if obs_time_match(token) or unit_system_match(token) :
+                        new_tokens.append([token])
+                    else :
+                        new_tokens.append(token_group[count:])
+                        break
+        return new_tokens
 
+    def parse_dot_a_message(self, message: str) -> list :
+        '''
+        Parse a .A or .AR message and return a list of OutputRecord objects
+        '''
         #-----------------------------#
         # parse the positional fields #
         #-----------------------------#
@@ -2651,16 +2628,13 @@ class ShefParser :
         if not time_zone :
             time_zone = 'Z'
         zi = self.get_time_zone(time_zone)
-        dateval = ShefParser.DateTime(dateval.year, dateval.month, dateval.day, tzinfo=zi)
         datastr = message[length:].strip()
         tokens  = self.tokenize_a_e_data_string(datastr, 'A', revised)
         #-----------------------------#
         # set the default data values #
         #-----------------------------#
-        if time_zone == 'Z' :
-            obstime = ShefParser.DateTime(dateval.year, dateval.month, dateval.day, 12, 0, 0, tzinfo=zi)
-        else :
-            obstime = ShefParser.DateTime(dateval.year, dateval.month, dateval.day, 0, 0, 0, tzinfo=zi)
+        # only the date of the header date is used, at 1200 for Z and 0000 otherwise
+        obstime = ShefParser.DateTime.cached(dateval.year, dateval.month, dateval.day, 12 if time_zone == 'Z' else 0, 0, 0, zi)
         last_explicit_time = obstime
         createtime_str     = None
         default_qualifier  = 'Z'
@@ -2671,26 +2645,38 @@ class ShefParser :
         #--------------------------------#
         # process the data string fields #
         #--------------------------------#
-        tokens = retokenize(tokens)
+        tokens = self.retokenize_dot_a_data(tokens)
+        # look up the token pattern methods, record class, and qualifier codes once instead of per token
+        data_string_item_match = self._data_string_item_pattern.match
+        obs_time_search        = self._obs_time_pattern2.search
+        obs_time_match         = self._obs_time_pattern2.match
+        create_time_match      = self._create_time_pattern.match
+        unit_system_match      = self._unit_system_pattern.match
+        data_qualifier_match   = self._data_qualifier_pattern.match
+        duration_code_match    = self._duration_code_pattern.match
+        output_record          = ShefParser.OutputRecord
+        qualifier_codes        = self._qualifier_codes
         relative_specified = False
-        for i in range(len(tokens)) :
-            if len(tokens[i]) == 1 :
-                token = tokens[i][0]
-                if self._obs_time_pattern2.search(token) :
+        for token_group in tokens :
+            if len(token_group) == 1 :
+                token = token_group[0]
+                m = data_string_item_match(token)
+                item = m.lastgroup if m else None
+                if item == "obs_time" :
                     #------------------------------------------------#
                     # set the observation time for subsequent values #
                     #------------------------------------------------#
                     pos = 0
                     while True :
-                        m = self._obs_time_pattern2.search(token[pos:])
+                        m = obs_time_search(token[pos:])
                         if not m : break
                         try :
                             if token[pos+1] in "JR" :
-                                obstime, relativetime, century_specified = self.get_observation_time(last_explicit_time, m.group(1).upper(), century_specified, dot_b=False)
+                                obstime, relativetime, century_specified = self.get_observation_time(last_explicit_time, m.group(1), century_specified, dot_b=False)
                                 if token[pos+1] == 'R' :
                                     relative_specified = True
                             else :
-                                obstime, relativetime, century_specified = self.get_observation_time(obstime, m.group(1).upper(), century_specified, dot_b=False)
+                                obstime, relativetime, century_specified = self.get_observation_time(obstime, m.group(1), century_specified, dot_b=False)
                                 last_explicit_time = obstime
                                 relative_specified = False
                             pos += m.end(1)+1
@@ -2700,29 +2686,29 @@ class ShefParser :
                     if token[pos:] :
                         self.error(f"Unexpected data string item: [{token}]")
                         return [] if self._reject_problematic else outrecs
-                elif self._create_time_pattern.match(token) :
+                elif item == "create_time" :
                     #---------------------------------------------#
                     # set the creation time for subsequent values #
                     #---------------------------------------------#
                     createtime_str = token[2:]
-                elif self._unit_system_pattern.match(token) :
+                elif item == "unit_system" :
                     #-------------------------------------------#
                     # set the unit system for subsequent values #
                     #-------------------------------------------#
-                    units = "EN" if token[2].upper() == 'E' else "SI"
-                elif self._data_qualifier_pattern.match(token) :
+                    units = "EN" if token[2] == 'E' else "SI"
+                elif item == "data_qualifier" :
                     #-------------------------------------------------#
                     # set the default qualifier for subsequent values #
                     #-------------------------------------------------#
-                    default_qualifier = token[2].upper()
-                    if default_qualifier not in self._qualifier_codes :
+                    default_qualifier = token[2]
+                    if default_qualifier not in qualifier_codes :
                         self.error(f"Bad data qualifier: [{default_qualifier}]")
                         return [] if self._reject_problematic else outrecs
-                elif self._duration_code_pattern.match(token) :
+                elif item == "duration_code" :
                     #----------------------------------------------------------------#
                     # set the duration for subequent values with duration code = 'V' #
                     #----------------------------------------------------------------#
-                    duration_unit = token[2].upper()
+                    duration_unit = token[2]
                     if duration_unit == 'Z' :
                         duration_value = None
                     else :
@@ -2741,11 +2727,11 @@ class ShefParser :
                 #------------#
                 # data value #
                 #------------#
-                code = tokens[i][0].upper()
+                code = token_group[0]
                 if len(code) < 2 :
                     self.error(f"Invalid PE code: [{code[:min(2, len(code))]}]")
                     return []
-                elif code not in self._send_codes and code[:2] not in self._pe_conversions and code[:2] not in self._addional_pe_codes :
+                elif code not in self._send_codes and code[:2] not in self._recognized_pe_codes :
                     self.warning(f"Unknown PE code: [{code[:min(2, len(code))]}], value(s) will be untransformed")
                 try :
                     parameter_code, use_prev_7am = self.get_parameter_code(code)
@@ -2766,40 +2752,38 @@ class ShefParser :
                         if self._reject_problematic :
                             return []
                         continue
-                    t = ShefParser.DateTime(obstime.year, obstime.month, obstime.day, obstime.hour, obstime.minute, obstime.second, tzinfo=obstime.tzinfo)
-                    if t.hour < 7 :
-                        t2 = t - timedelta(days=1)
-                        if not isinstance(t2, ShefParser.DateTime) :
-                            raise ShefParser.ParseException(f"Expected ShefParser.DateTime object, got [{t2.__class__.__name__}]")
-                        t = t2
-                    obstime = ShefParser.DateTime(t.year, t.month, t.day, 7, 0, 0, tzinfo=t.tzinfo)
-                if len(tokens[i]) == 1 :
+                    # move to 0700 on the observation date, or on the previous date if before 0700
+                    obsdate = date(obstime.year, obstime.month, obstime.day)
+                    if obstime.hour < 7 :
+                        obsdate = date.fromordinal(obsdate.toordinal() - 1)
+                    obstime = ShefParser.DateTime.cached(obsdate.year, obsdate.month, obsdate.day, 7, 0, 0, obstime.tzinfo)
+                if len(token_group) == 1 :
                     continue # same as a NULL field - a parameter code with no value
                 try :
-                    value_token = tokens[i][1].upper()
+                    value_token = token_group[1]
                     value, qualifier = self.parse_value_token(value_token, parameter_code[:2], units)
                 except ShefParser.Exc as spe :
-                    if self._obs_time_pattern2.match(value_token) :
+                    if obs_time_match(value_token) :
                         self.error(f"Expected value for parameter [{parameter_code}], got, observation time [{value_token}]")
                         if self._reject_problematic :
                             return []
                         break
-                    elif self._create_time_pattern.match(value_token) :
+                    elif create_time_match(value_token) :
                         self.error(f"Expected value for parameter [{parameter_code}], got, creation time [{value_token}]")
                         if self._reject_problematic :
                             return []
                         break
-                    elif self._unit_system_pattern.match(value_token) :
+                    elif unit_system_match(value_token) :
                         self.error(f"Expected value for parameter [{parameter_code}], got, unit system [{value_token}]")
                         if self._reject_problematic :
                             return []
                         break
-                    elif self._data_qualifier_pattern.match(value_token) :
+                    elif data_qualifier_match(value_token) :
                         self.error(f"Expected value for parameter [{parameter_code}], got, data qualifier [{value_token}]")
                         if self._reject_problematic :
                             return []
                         break
-                    elif self._duration_code_pattern.match(value_token) :
+                    elif duration_code_match(value_token) :
                         self.error(f"Expected value for parameter [{parameter_code}], got, duration code [{value_token}]")
                         if self._reject_problematic :
                             return []
@@ -2811,21 +2795,21 @@ class ShefParser :
                     continue
                 if not qualifier :
                     qualifier = default_qualifier
-                if qualifier not in self._qualifier_codes :
+                if qualifier not in qualifier_codes :
                     self.warning(f"Unknown data qualifier: [{qualifier}], qualifier set to Z")
                     qualifier = 'Z'
                 comment = None
-                if len(tokens[i]) > 2 :
-                    comment = tokens[i][2]
+                if len(token_group) > 2 :
+                    comment = token_group[2]
                     if comment :
                         if comment[0] not in "'\"" :
-                            self.error(f"Invalid retained comment [{tokens[i][2]}]")
+                            self.error(f"Invalid retained comment [{token_group[2]}]")
                             comment = None
 
                 if parameter_code[3] == 'F' and not createtime_str :
                     self.warning(f"Forecast parameter [{parameter_code}] value [{value}] does not have creation date")
 
-                outrecs.append(ShefParser.OutputRecord(
+                outrecs.append(output_record(
                     self,
                     location,
                     parameter_code,
@@ -2837,26 +2821,50 @@ class ShefParser :
                     revised,
                     duration_unit,
                     duration_value,
-                    comment = comment))
+                    None,
+                    0,
+                    comment))
         return outrecs
 
-    def parse_dot_e_message(self, message: str) -> list :
+    @staticmethod
+    def retokenize_dot_e_data(tokens: list) -> list :
         '''
-        Parse a .E or .ER message and return a list of OutputRecord objects
+        Accomodates sloppy slash usage in .E message like shefit
         '''
-        def retokenize(tokens: list) -> list :
-            '''
-            Accomodates sloppy slash usage in .E message like shefit
-            '''
-            new_tokens: list[Any] = []
-            for token in tokens :
-                for subtoken in token :
-                    if subtoken and subtoken[0] in "'\"" and len(new_tokens) > 0 :
-                        new_tokens[-1] += [subtoken]
+        new_tokens: list[Any] = []
+        for token in tokens :
+            for subtoken in token :
+                if subtoken and subtoken[0] in "'\"" and len(new_tokens) > 0 :
+                    new_tokens[-1] += [subtoken]
+                else :
+                    new_tokens.append([subtoken])
+        return new_tokens
+
+    @staticmethod
+    def retokenize_dot_b_data(tokens: list) -> list :
+        '''
+        Accomodates sloppy slash usage in .B message body like shefit
+        '''
+        new_tokens: list[str] = []
+        for token in tokens :
+            if not token :
+                new_tokens.append(token)
+            elif '"' not in token and "'" not in token :
+                # no retained comments, so no whitespace to hide or restore
+                new_tokens.extend(token.split())
+            else :
+                for subtoken in ShefParser.hide_quoted_whitespace(token).split() :
+                    subtoken = ShefParser.unhide_quoted_whitespace(subtoken)
+                    if subtoken[0] in "'\"" :
+                        new_tokens[-1] += ' '+subtoken
                     else :
-                        new_tokens.append([subtoken])
-            return new_tokens
+                        new_tokens.append(subtoken)
+        return new_tokens
 
+    def parse_dot_e_message(self, message: str) -> list :
+        '''
+        Parse a .E or .ER message and return a list of OutputRecord objects
+        '''
         #-----------------------------#
         # parse the positional fields #
         #-----------------------------#
@@ -2878,16 +2886,13 @@ class ShefParser :
         if not time_zone :
             time_zone = 'Z'
         zi = self.get_time_zone(time_zone)
-        dateval = ShefParser.DateTime(dateval.year, dateval.month, dateval.day, tzinfo=zi)
         datastr = message[length:].strip()
         tokens  = self.tokenize_a_e_data_string(datastr, 'E', revised)
         #-----------------------------#
         # set the default data values #
         #-----------------------------#
-        if time_zone == 'Z' :
-            obstime = ShefParser.DateTime(dateval.year, dateval.month, dateval.day, 12, 0, 0, tzinfo=zi)
-        else :
-            obstime = ShefParser.DateTime(dateval.year, dateval.month, dateval.day, 0, 0, 0, tzinfo=zi)
+        # only the date of the header date is used, at 1200 for Z and 0000 otherwise
+        obstime = ShefParser.DateTime.cached(dateval.year, dateval.month, dateval.day, 12 if time_zone == 'Z' else 0, 0, 0, zi)
         parameter_code     = None
         original_obstime   = obstime
         last_explicit_time = obstime
@@ -2903,30 +2908,37 @@ class ShefParser :
         # process the data string fields #
         #--------------------------------#
         use_prev_7am = False
-        tokens = retokenize(tokens)
-        for i in range(len(tokens)) :
-            if len(tokens[i]) > 1 : self.error(f"Invalid data string")
-            token = tokens[i][0]
+        tokens = ShefParser.retokenize_dot_e_data(tokens)
+        # look up the token pattern methods, record class, and qualifier codes once instead of per token
+        data_string_item_match = self._data_string_item_pattern.match
+        obs_time_search        = self._obs_time_pattern2.search
+        output_record          = ShefParser.OutputRecord
+        qualifier_codes        = self._qualifier_codes
+        for token_group in tokens :
+            if len(token_group) > 1 : self.error(f"Invalid data string")
+            token = token_group[0]
             value = None
             comment = None
             relative_specified = False
-            if self._obs_time_pattern2.search(token) :
+            m = data_string_item_match(token)
+            item = m.lastgroup if m else None
+            if item == "obs_time" :
                 #------------------------------------------------#
                 # set the observation time for subsequent values #
                 #------------------------------------------------#
                 pos = 0
                 while True :
-                    m = self._obs_time_pattern2.search(token[pos:])
+                    m = obs_time_search(token[pos:])
                     if not m : break
                     try :
                         if token[pos+1] in "JR" :
-                            obstime, relativetime, century_specified = self.get_observation_time(last_explicit_time.astimezone('Z' if self.shefit_times else ShefParser.UTC), m.group(1).upper(), century_specified, dot_b=False)
+                            obstime, relativetime, century_specified = self.get_observation_time(last_explicit_time.astimezone('Z' if self.shefit_times else ShefParser.UTC), m.group(1), century_specified, dot_b=False)
                             if token[pos+1] == 'R' :
                                 relative_specified = True
                                 if use_prev_7am :
                                     raise ShefParser.ParseException("Cannot use relative date/time offsets with send codes QY, HY, or PY")
                         else :
-                            obstime, relativetime, century_specified = self.get_observation_time(original_obstime, m.group(1).upper(), century_specified, dot_b=False)
+                            obstime, relativetime, century_specified = self.get_observation_time(original_obstime, m.group(1), century_specified, dot_b=False)
                             last_explicit_time = obstime
                     except ShefParser.Exc as spe :
                         self.error(str(spe))
@@ -2938,31 +2950,31 @@ class ShefParser :
                     self.error(f"Unexpected data string item: [{token}]")
                     return [] if self._reject_problematic else outrecs
                 time_series_code = 1
-            elif self._create_time_pattern.match(token) :
+            elif item == "create_time" :
                 #---------------------------------------------#
                 # set the creation time for subsequent values #
                 #---------------------------------------------#
                 createtime_str = token[2:]
                 obstime = last_explicit_time
                 time_series_code = 1
-            elif self._unit_system_pattern.match(token) :
+            elif item == "unit_system" :
                 #-------------------------------------------#
                 # set the unit system for subsequent values #
                 #-------------------------------------------#
-                units = "EN" if token[2].upper() == 'E' else "SI"
-            elif self._data_qualifier_pattern.match(token) :
+                units = "EN" if token[2] == 'E' else "SI"
+            elif item == "data_qualifier" :
                 #-------------------------------------------------#
                 # set the default qualifier for subsequent values #
                 #-------------------------------------------------#
-                default_qualifier = token[2].upper()
-                if default_qualifier not in self._qualifier_codes :
+                default_qualifier = token[2]
+                if default_qualifier not in qualifier_codes :
                     self.error(f"Bad data qualifier: [{default_qualifier}]")
                     return [] if self._reject_problematic else outrecs
-            elif self._duration_code_pattern.match(token) :
+            elif item == "duration_code" :
                 #----------------------------------------------------------------#
                 # set the duration for subequent values with duration code = 'V' #
                 #----------------------------------------------------------------#
-                duration_unit = token[2].upper()
+                duration_unit = token[2]
                 if duration_unit == 'Z' :
                     duration_value = None
                 else :
@@ -2970,7 +2982,7 @@ class ShefParser :
                     if duration_value > 99 :
                         raise ShefParser.ParseException(f"Invalid duration code variable [{token}]")
                 time_series_code = 1
-            elif self._interval_pattern.match(token) :
+            elif item == "interval" :
                 #-----------------------------------------#
                 # set the intrerval for subsequent values #
                 #-----------------------------------------#
@@ -2982,51 +2994,34 @@ class ShefParser :
                     self.error("Interval specified more than once")
                     return [] if self._reject_problematic else outrecs
                 time_series_code = 1
-                interval_unit = token[2].upper()
+                interval_unit = token[2]
                 interval_value = int(token[3:])
-                duration_code = interval_value
                 if abs(interval_value) > 99 :
                     raise ShefParser.ParseException(f"Invalid interval value: [{token}]")
-                if interval_unit == 'S' :
-                    interval = timedelta(seconds=interval_value)
-                    duration_code += 7000
-                elif interval_unit == 'N' :
-                    pass
-                elif interval_unit == 'H' :
-                    interval = timedelta(hours=interval_value)
-                    duration_code += 1000
-                elif interval_unit == 'D' :
-                    interval = timedelta(days=interval_value)
-                    duration_code += 2000
-                elif interval_unit == 'M' :
-                    interval = MonthsDelta(interval_value)
-                    duration_code += 3000
-                elif interval_unit == 'E' :
-                    interval = MonthsDelta(interval_value, eom=True)
-                    duration_code += 3000
-                elif interval_unit == 'Y' :
-                    duration_code += 4000
-                try :
-                    if parameter_code[2] == "I":
-                        duration_id = "I"
-                    else:
-                        duration_id = self._duration_ids[duration_code]
-                except KeyError :
-                    self.error(f"No valid duration code for time interval [{token}]")
-                    return [] if self._reject_problematic else outrecs
+                duration_code_offset, new_interval = ShefParser.INTERVAL_UNITS[interval_unit]
+                duration_code = interval_value + duration_code_offset
+                if new_interval :
+                    interval = new_interval(interval_value)
+                if parameter_code[2] == "I":
+                    duration_id = "I"
+                else:
+                    duration_id = self._duration_ids.get(duration_code)
+                    if duration_id is None :
+                        self.error(f"No valid duration code for time interval [{token}]")
+                        return [] if self._reject_problematic else outrecs
                 parameter_code = f"{parameter_code[:2]}{duration_id}{parameter_code[3:]}"
-            elif self._parameter_code_pattern.match(token) :
+            elif item == "parameter_code" :
                 #-------------------------------------------------#
                 # set the parameter code for the susequent values #
                 #-------------------------------------------------#
                 if parameter_code :
                     self.error("Parameter code specified more than once")
                     return [] if self._reject_problematic else outrecs
-                code = token.upper()
+                code = token
                 if len(code) < 2 :
                     self.error(f"Invalid PE code: [{code[:min(2, len(code))]}]")
                     return [] if self._reject_problematic else outrecs
-                elif code not in self._send_codes and code[:2] not in self._pe_conversions and code[:2] not in self._addional_pe_codes :
+                elif code not in self._send_codes and code[:2] not in self._recognized_pe_codes :
                     self.warning(f"Unknown PE code: [{code[:2]}], value(s) will be untransformed")
                 parameter_code, use_prev_7am = self.get_parameter_code(code)
                 orig_parameter_code = code
@@ -3037,24 +3032,24 @@ class ShefParser :
                         raise ShefParser.ParseException("Cannot use Zulu/UTC time zone with send codes QY, HY, or PY")
                     if interval :
                         raise ShefParser.ParseException("Cannot data interval with send codes QY, HY, or PY")
-            elif self._value_pattern.match(token) :
+            elif item == "value" :
                 #------------#
                 # data value #
                 #------------#
                 if parameter_code is None :
                     raise ShefParser.ParseException("Value encountered before parameter code")
-                value, qualifier = self.parse_value_token(token.upper(), parameter_code[:2], units)
+                value, qualifier = self.parse_value_token(token, parameter_code[:2], units)
                 if not qualifier :
                     qualifier = default_qualifier
-                if qualifier not in self._qualifier_codes :
+                if qualifier not in qualifier_codes :
                     self.warning(f"Unknown data qualifier: [{qualifier}], qualifier set to Z")
                     qualifier = 'Z'
                 comment = None
-                if len(tokens[i]) > 1 :
-                    comment = tokens[i][1]
+                if len(token_group) > 1 :
+                    comment = token_group[1]
                     if comment :
                         if comment[0] not in "'\"" :
-                            self.error(f"Invalid retained comment [{tokens[i][2]}]")
+                            self.error(f"Invalid retained comment [{token_group[2]}]")
                             comment = None
             elif not token :
                 #------------------------------------#
@@ -3088,7 +3083,7 @@ class ShefParser :
                 if parameter_code[3] == 'F' and not createtime_str :
                     self.warning(f"Forecast parameter [{parameter_code}] value [{value}] does not have creation date")
 
-                outrec = ShefParser.OutputRecord(
+                outrec = output_record(
                     self,
                     location,
                     parameter_code,
@@ -3100,8 +3095,9 @@ class ShefParser :
                     revised,
                     duration_unit,
                     duration_value,
-                    time_series_code = time_series_code,
-                    comment = comment)
+                    None,
+                    time_series_code,
+                    comment)
 
                 outrecs.append(outrec)
                 time_series_code = 2
@@ -3116,27 +3112,6 @@ class ShefParser :
         '''
         Parses a .B or .BR message and return a list of OutputRecord objects
         '''
-
-        def retokenize(tokens: list) -> list :
-            '''
-            Accomodates sloppy slash usage in .B message body like shefit
-            '''
-            new_tokens = []
-            for i in range(len(tokens)) :
-                if not tokens[i] :
-                    new_tokens.append(tokens[i])
-                    continue
-                tokens[i] = ShefParser.hide_quoted_whitespace(tokens[i])
-                temp_tokens = tokens[i].split()
-                for j in range(len(temp_tokens)) :
-                    if temp_tokens[j][0] in "'\"" :
-                        new_tokens[-1] += ' '+temp_tokens[j]
-                    else :
-                        new_tokens.append(temp_tokens[j])
-            for i in range(len(new_tokens)) :
-                new_tokens[i] = ShefParser.unhide_quoted_whitespace(new_tokens[i])
-            return new_tokens
-
         #------------------------------------------------------------------------------------#
         # separate the header (positional fields and parameter control) from the data string #
         #------------------------------------------------------------------------------------#
@@ -3174,9 +3149,9 @@ class ShefParser :
         # set the default data values #
         #-----------------------------#
         if time_zone == 'Z' :
-            default_obstime = ShefParser.DateTime(dateval.year, dateval.month, dateval.day, 12, 0, 0, tzinfo=zi)
+            default_obstime = ShefParser.DateTime.cached(dateval.year, dateval.month, dateval.day, 12, 0, 0, zi)
         else :
-            default_obstime = ShefParser.DateTime(dateval.year, dateval.month, dateval.day, 24, 0, 0, tzinfo=zi)
+            default_obstime = ShefParser.DateTime.cached(dateval.year, dateval.month, dateval.day, 24, 0, 0, zi)
         dateval = ShefParser.DateTime(dateval.year, dateval.month, dateval.day, tzinfo=zi)
         parameter_code     = None
         obstime_specified  = False
@@ -3200,25 +3175,34 @@ class ShefParser :
         # process the parameter control fields #
         #--------------------------------------#
         param_str = header[m.end():].strip()
-        while self._multiple_obs_time_pattern.search(param_str) :
-            param_str = self._multiple_obs_time_pattern.sub(r"\1@\6\7", param_str)
-        param_tokens = list(map(lambda s : s.strip().strip('@'), param_str.strip('/').split('/')))
+        param_str = self._multiple_obs_time_pattern.sub(r"\1@", param_str)
+        # the parameter control fields have no retained comments, so normalize the case once
+        param_tokens = [token.strip().strip('@') for token in param_str.upper().strip('/').split('/')]
+        # look up the token pattern methods and qualifier codes once instead of per token
+        data_string_item_match  = self._data_string_item_pattern.match
+        body_item_match         = self._dot_b_body_item_pattern.match
+        obs_time_search         = self._obs_time_pattern2.search
+        body_line_match         = self._dot_b_body_line_pattern.match
+        retained_comment_search = self._retained_comment_pattern.search
+        qualifier_codes         = self._qualifier_codes
         last = None
         obstime_error = None
         for token in param_tokens :
             try :
-                if self._obs_time_pattern2.search(token) :
+                m = data_string_item_match(token)
+                item = m.lastgroup if m else None
+                if item == "obs_time" :
                     #----------------------------------------------------#
                     # set the observation time for subsequent parameters #
                     #----------------------------------------------------#
                     pos = 0
                     while True :
-                        m = self._obs_time_pattern2.search(token[pos:])
+                        m = obs_time_search(token[pos:])
                         if not m :
                             self.error(f"Unexpected data string item: [{token[pos:]}]")
                             return []
                         try :
-                            obstime, relativetime, century_specified = self.get_observation_time(last_explicit_time, m.group(1).upper(), century_specified, dot_b=True)
+                            obstime, relativetime, century_specified = self.get_observation_time(last_explicit_time, m.group(1), century_specified, dot_b=True)
                             if relativetime is not None:
                                 obstime_specified = False
                             else :
@@ -3231,42 +3215,42 @@ class ShefParser :
                         pos += m.end()
                         if pos >= len(token) :
                             break
-                elif self._create_time_pattern.match(token) :
+                elif item == "create_time" :
                     #-------------------------------------------------#
                     # set the creation time for subsequent parameters #
                     #-------------------------------------------------#
                     createtime_str = token[2:]
-                elif self._unit_system_pattern.match(token) :
+                elif item == "unit_system" :
                     #-----------------------------------------------#
                     # set the unit system for subsequent parameters #
                     #-----------------------------------------------#
-                    units = "EN" if token[2].upper() == 'E' else "SI"
-                elif self._data_qualifier_pattern.match(token) :
+                    units = "EN" if token[2] == 'E' else "SI"
+                elif item == "data_qualifier" :
                     #---------------------------------------------#
                     # set the qualifier for subsequent parameters #
                     #---------------------------------------------#
-                    qualifier = token[2].upper()
-                    if qualifier not in self._qualifier_codes :
+                    qualifier = token[2]
+                    if qualifier not in qualifier_codes :
                         raise ShefParser.ParseException(f"Bad data qualifier: [{qualifier}]")
-                elif self._duration_code_pattern.match(token) :
+                elif item == "duration_code" :
                     #--------------------------------------------------------------------#
                     # set the duration for subequent parameters with duration code = 'V' #
                     #--------------------------------------------------------------------#
-                    duration_unit = token[2].upper()
+                    duration_unit = token[2]
                     if duration_unit == 'Z' :
                         duration_value = None
                     else :
                         duration_value = int(token[3:])
                         if duration_value > 99 :
                             raise ShefParser.ParseException(f"Invalid duration code variable [{token}]")
-                elif self._parameter_code_pattern.match(token) :
+                elif item == "parameter_code" :
                     #----------------------------------------------------------#
                     # create a new parameter control object for this parameter #
                     #----------------------------------------------------------#
-                    code = token.upper()
+                    code = token
                     if len(code) < 2 :
                         raise ShefParser.ParseException(f"Invalid PE code: [{code[:min(2, len(code))]}]")
-                    elif code not in self._send_codes and code[:2] not in self._pe_conversions :
+                    elif code not in self._send_codes and code[:2] not in self._recognized_pe_codes :
                         self.warning(f"Unknown PE code: [{code[:min(2, len(code))]}], value(s) will be untransformed")
                     parameter_code, use_prev_7am = self.get_parameter_code(code)
                     orig_parameter_code = code
@@ -3324,10 +3308,14 @@ class ShefParser :
         #------------------#
         # process the body #
         #------------------#
-        body = body.replace(',', '\n')
-        bodylines = list(map(lambda x : x.strip(), body.split('\n')))
+        # packed reports (separated by commas) are processed as separate lines, blank lines are skipped
+        bodylines = [line for line in map(str.strip, body.replace(',', '\n').split('\n')) if line]
+        # per-parameter overrides for the current body line, cleared in place for each line
+        no_overrides = len(hdr_param_info) * [None]
+        time_overrides: list[Any] = no_overrides[:]
+        relativetime_overrides: list[Any] = no_overrides[:]
         last = None
-        for i in range(len(bodylines)) :
+        for bodyline in bodylines :
             p = 0
             outrec_pos = 0
             obstime_override = None
@@ -3340,28 +3328,30 @@ class ShefParser :
             duration_unit = 'Z'
             duration_value = None
             skip_parameter = False
-            time_overrides = len(hdr_param_info) * [None]
-            relativetime_overrides = len(hdr_param_info) * [None]
-            if not self._dot_b_body_line_pattern.match(bodylines[i]) and bodylines[i].strip() :
-                self.error(f"Invalid item in body line or packed report: [{bodylines[i]}]")
+            time_overrides[:] = no_overrides
+            relativetime_overrides[:] = no_overrides
+            m = body_line_match(bodyline)
+            if not m :
+                self.error(f"Invalid item in body line or packed report: [{bodyline}]")
                 if self._reject_problematic :
                     return []
                 continue
-            if not bodylines[i].strip() :
-                continue
-            location = bodylines[i].split()[0]
-            bodytokens = list(map(lambda s: s.strip(), bodylines[i][len(location):].strip().split('/')))
-            bodytokens = retokenize(bodytokens)
+            location = m.group(1)
+            bodytokens = [token.strip() for token in bodyline[m.end(1):].strip().split('/')]
+            bodytokens = ShefParser.retokenize_dot_b_data(bodytokens)
             for token in bodytokens :
                 try :
                     if p >= len(hdr_param_info) :
                         if token :
-                            self.warning(f"Too many tokens in .B body line [{bodylines[i]}]. Header contains {len(hdr_param_info)} valid parameters")
+                            self.warning(f"Too many tokens in .B body line [{bodyline}]. Header contains {len(hdr_param_info)} valid parameters")
                         break
                     if not token :
                         p += 1
                         continue
-                    if self._obs_time_pattern.match(token) :
+                    # every body item other than a value starts with 'D', so values skip the match
+                    m = body_item_match(token) if token[0] in "Dd" else None
+                    item = m.lastgroup if m else None
+                    if item == "obs_time" :
                         #-------------------#
                         # obs time override #
                         #-------------------#
@@ -3386,22 +3376,22 @@ class ShefParser :
                         except ShefParser.Exc as spe :
                             skip_parameter = True
                             raise
-                    elif self._create_time_pattern.match(token) :
+                    elif item == "create_time" :
                         #----------------------#
                         # create time override #
                         #----------------------#
                         createtime_override_str = token[2:]
-                    elif self._unit_system_pattern.match(token) :
+                    elif item == "unit_system" :
                         #----------------#
                         # units override #
                         #----------------#
                         units_override = "EN" if token[2].upper() == 'E' else "SI"
-                    elif self._data_qualifier_pattern.match(token) :
+                    elif item == "data_qualifier" :
                         #----------------------------#
                         # default qualifier override #
                         #----------------------------#
                         default_qualifier = token[2]
-                    elif self._duration_code_pattern.match(token) :
+                    elif item == "duration_code" :
                         #----------------------------#
                         # duration variable override #
                         #----------------------------#
@@ -3423,9 +3413,9 @@ class ShefParser :
                                 raise
                             if default_qualifier and not qualifier :
                                 qualifier = default_qualifier
-                            if qualifier and qualifier not in self._qualifier_codes :
+                            if qualifier and qualifier not in qualifier_codes :
                                 self.warning(f"Unknown data qualifier: [{qualifier}], qualifier set to Z")
-                            m = self._retained_comment_pattern.search(token)
+                            m = retained_comment_search(token)
                             if m :
                                 comment = m.group(0)
                             if comment :